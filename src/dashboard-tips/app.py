@@ -1,3 +1,5 @@
+import json
+import threading
 import requests
 from decimal import Decimal, InvalidOperation
 import pandas as pd
@@ -7,6 +9,78 @@ from shiny import App, Inputs, Outputs, Session, reactive, render, ui
 # API base URL
 API_BASE = "http://127.0.0.1:8001/"
 
+# Row limits used by the REST endpoints, kept when applying diffs
+TABLE_LIMITS = {"positions": 15, "closed_positions": 15, "transactions": 50}
+
+
+class EventFeed:
+    """
+    Reads the API's server-sent events stream on a background thread.
+    Events are buffered until the session drains them; `version` lets
+    a cheap reactive.poll notice new ones without any HTTP traffic.
+    """
+
+    def __init__(self, url: str):
+        self._url = url
+        self._lock = threading.Lock()
+        self._pending = []
+        self._version = 0
+        self._stopped = threading.Event()
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def version(self) -> int:
+        return self._version
+
+    def drain(self):
+        with self._lock:
+            events, self._pending = self._pending, []
+        return events
+
+    def stop(self):
+        self._stopped.set()
+
+    def _push(self, event: str, data: str):
+        try:
+            payload = json.loads(data)
+        except ValueError:
+            return
+        with self._lock:
+            self._pending.append((event, payload))
+            self._version += 1
+
+    def _run(self):
+        while not self._stopped.is_set():
+            try:
+                with requests.get(self._url, stream=True, timeout=(5, 60)) as resp:
+                    event, data = None, []
+                    for line in resp.iter_lines(decode_unicode=True):
+                        if self._stopped.is_set():
+                            return
+                        if not line:
+                            if event and data:
+                                self._push(event, "\n".join(data))
+                            event, data = None, []
+                        elif line.startswith(":"):
+                            continue
+                        else:
+                            field, _, value = line.partition(":")
+                            value = value[1:] if value.startswith(" ") else value
+                            if field == "event":
+                                event = value
+                            elif field == "data":
+                                data.append(value)
+            except Exception as e:
+                print(e)
+            self._stopped.wait(5)
+
+
+def to_decimal(raw) -> Decimal:
+    try:
+        return Decimal(raw or 0)
+    except (InvalidOperation, TypeError):
+        return Decimal(0)
+
+
 # Server logic
 def server(input, output: Outputs, session):
     
@@ -22,6 +96,14 @@ def server(input, output: Outputs, session):
         params = "&".join([f"brokers={broker}" for broker in selected_brokers])
         return f"?{params}"
 
+    def broker_selected(selected_brokers, name: str) -> bool:
+        """
+        Mirror build_broker_params: no selection or all selected means everything.
+        """
+        if not selected_brokers or len(selected_brokers) == 2:
+            return True
+        return name.lower() in selected_brokers
+
     def fetch_json(endpoint: str):
         """
         Helper to fetch JSON from `${API_BASE}/{endpoint}/{account_id}`.
@@ -36,6 +118,15 @@ def server(input, output: Outputs, session):
             print(e)
             return None
 
+    feed = EventFeed(API_BASE + "events")
+    session.on_ended(feed.stop)
+
+    unrealized = reactive.value(Decimal(0))
+    realized = reactive.value(Decimal(0))
+    positions = reactive.value(pd.DataFrame())
+    closed_positions = reactive.value(pd.DataFrame())
+    transactions = reactive.value(pd.DataFrame())
+
     @render.ui
     def val():
         active_brokers = input.Exchanges()
@@ -48,55 +139,104 @@ def server(input, output: Outputs, session):
             broker_name = active_brokers[0].title()
             return ui.p(f"Filtering by: {broker_name}", style="color: blue;")
 
-    @render.text
-    @reactive.calc
-    def unrealized_gain():
+    def make_table(endpoint: str):
+        data = fetch_json(endpoint)
+        return pd.DataFrame(data or [])
+
+    @reactive.effect
+    def load_snapshot():
+        """
+        Full REST fetch, only when the broker filter changes.
+        Everything after that arrives as diffs over /events.
+        """
         selected_brokers = input.Exchanges()
         broker_params = build_broker_params(selected_brokers)
         data = fetch_json("unrealized_gains" + broker_params)
-        raw = data.get("unrealized_gain") if data else None
-        try:
-            gain = Decimal(raw or 0)
-        except (InvalidOperation, TypeError):
-            gain = Decimal(0)
-        return f"${gain:,.2f}"
+        unrealized.set(to_decimal(data.get("unrealized_gain") if data else None))
+        data = fetch_json("realized_gains" + broker_params)
+        realized.set(to_decimal(data.get("realized_gain") if data else None))
+        positions.set(make_table("active_positions" + broker_params))
+        closed_positions.set(make_table("closed_positions" + broker_params))
+        transactions.set(make_table("transactions" + broker_params))
+
+    @reactive.poll(feed.version, interval_secs=1)
+    def incoming_events():
+        return feed.drain()
+
+    def prepend_rows(table, rows, limit):
+        if not rows:
+            return table
+        fresh = pd.DataFrame(rows)
+        return pd.concat([fresh, table], ignore_index=True).head(limit)
+
+    @reactive.effect
+    def apply_events():
+        events = incoming_events()
+        with reactive.isolate():
+            selected_brokers = input.Exchanges()
+            for event, data in events:
+                if event == "unrealized_gain":
+                    unrealized.set(sum(
+                        (to_decimal(totals.get("unrealized_gain"))
+                         for name, totals in data.items()
+                         if broker_selected(selected_brokers, name)),
+                        Decimal(0),
+                    ))
+                elif event == "realized_gain":
+                    realized.set(realized.get() + sum(
+                        (to_decimal(delta) for name, delta in data.items()
+                         if broker_selected(selected_brokers, name)),
+                        Decimal(0),
+                    ))
+                elif event == "transactions":
+                    rows = [r for r in data if broker_selected(selected_brokers, r["broker"])]
+                    transactions.set(prepend_rows(
+                        transactions.get(), rows[::-1], TABLE_LIMITS["transactions"]))
+                elif event == "closed_positions":
+                    rows = [r for r in data if broker_selected(selected_brokers, r["broker"])]
+                    closed_positions.set(prepend_rows(
+                        closed_positions.get(), rows[::-1], TABLE_LIMITS["closed_positions"]))
+                elif event == "positions":
+                    table = positions.get()
+                    rows = [r for r in data["upserted"] if broker_selected(selected_brokers, r["broker"])]
+                    closed = set(data["closed"])
+                    if "id" in table and table["id"].isin(closed).any():
+                        # A closed lot leaves a gap only the server can fill
+                        positions.set(make_table(
+                            "active_positions" + build_broker_params(selected_brokers)
+                        ))
+                        continue
+                    if "id" in table:
+                        table = table[~table["id"].isin({r["id"] for r in rows})]
+                    table = prepend_rows(table, rows, len(table) + len(rows))
+                    if "bought_at" in table:
+                        # Partially sold lots keep their place in buy_time order
+                        table = table.sort_values("bought_at", ascending=False)
+                    positions.set(table.head(TABLE_LIMITS["positions"]).reset_index(drop=True))
+
+    @render.text
+    def unrealized_gain():
+        return f"${unrealized():,.2f}"
 
     @render.text
     def realized_gain():
-        selected_brokers = input.Exchanges()
-        broker_params = build_broker_params(selected_brokers)
-        data = fetch_json("realized_gains" + broker_params)
-        raw = data.get("realized_gain") if data else None
-        try:
-            gain = Decimal(raw or 0)
-        except (InvalidOperation, TypeError):
-            gain = Decimal(0)
-        return f"${gain:,.2f}"
+        return f"${realized():,.2f}"
 
-    def make_table(endpoint: str):
-        data = fetch_json(endpoint)
-        return pd.DataFrame(data or [])
+    def display(table):
+        # Row ids and sort keys are only needed to apply diffs
+        return table.drop(columns=["id", "bought_at"], errors="ignore")
 
     @render.data_frame
     def unrealized_table():
-        selected_brokers = input.Exchanges()
-        broker_params = build_broker_params(selected_brokers)
-        endpoint = "active_positions" + broker_params
-        return make_table(endpoint)
+        return display(positions())
 
     @render.data_frame
     def realized_table():
-        selected_brokers = input.Exchanges()
-        broker_params = build_broker_params(selected_brokers)
-        endpoint = "closed_positions" + broker_params
-        return make_table(endpoint)
+        return display(closed_positions())
 
     @render.data_frame
     def transactions_table():
-        selected_brokers = input.Exchanges()
-        broker_params = build_broker_params(selected_brokers)
-        endpoint = "transactions" + broker_params
-        return make_table(endpoint)
+        return display(transactions())
 
 
 
@@ -0,0 +1,194 @@
+from .cb_jwt import create_jwt
+from .cb_hmac import get_hmac_credentials
+from ..fx import FxMatrix, fx_matrix, BASE_CURRENCY
+from ..archive import get_archive
+from ..settings import get_settings
+from decimal import Decimal
+from functools import cached_property
+from typing import Callable, List, Optional
+from dataclasses import dataclass
+import requests
+from dateutil.parser import isoparse
+
+@dataclass
+class Account:
+    id: str
+    balance: Decimal
+    currency: str
+    # Cash wallets (USD, EUR, ...) hold the quote side of trades, not positions
+    fiat: bool = False
+
+def is_fiat_account(raw: dict) -> bool:
+    """
+    Whether a raw /v2/accounts entry is a fiat wallet, from either the
+    account type or its currency's type.
+    """
+    currency = raw.get("currency")
+    return raw.get("type") == "fiat" or (
+        isinstance(currency, dict) and currency.get("type") == "fiat"
+    )
+
+def clean_transactions(transactions: List[dict]) -> List[dict]:
+    """
+    Drop staking rewards and anything created before CUTOFF_DATE.
+    Shared by the live and replay services so a change here replays.
+    """
+    cutoff = get_settings().cutoff_date
+    return [
+        tx
+        for tx in transactions
+        if not ("staking" in tx.get("type"))
+            and isoparse(tx["created_at"]) >= cutoff
+    ]
+
+class CoinbaseService:
+    def __init__(
+        self,
+        api_id: str,
+        api_secret: str,
+        price_listener: Optional[Callable[[str, Decimal], object]] = None,
+        fx: Optional[FxMatrix] = None,
+    ):
+        self._api_id = api_id
+        self._api_secret = api_secret
+        self._price_listener = price_listener
+        self._fx = fx or fx_matrix
+        self._base_url = "https://api.coinbase.com"
+
+    @cached_property
+    def _client(self):
+        # The SDK client is only needed for spot prices; build it on demand
+        from coinbase.wallet.client import Client
+
+        return Client(self._api_id, self._api_secret)
+
+    @cached_property
+    def assets(self) -> List[Account]:
+        """
+        Active accounts, fetched on first access rather than per construction.
+        """
+        return self.get_active_accounts()
+
+    def _raw_accounts(self) -> List[dict]:
+        """Internal: fetch raw list of account-dicts."""
+        path = "/v2/accounts"
+        token = create_jwt("GET", path)
+        headers = {"Authorization": f"Bearer {token}"}
+        url = self._base_url + path
+        data = requests.get(url, headers=headers).json().get("data", [])
+        archive = get_archive()
+        if archive is not None:
+            archive.append("accounts", data)
+            # Once per account listing (i.e. per sync), not per FX refresh
+            archive.append("rates", self._fx.snapshot())
+        return data
+
+    def get_all_accounts(self) -> List[Account]:
+        """
+        Returns every account as an Account object.
+        """
+        raws: List[dict] = self._raw_accounts()
+        return [
+            Account(
+                id = acct["id"],
+                balance = Decimal(acct["balance"]["amount"]),
+                currency = acct["balance"]["currency"],
+                fiat = is_fiat_account(acct),
+            )
+            for acct in raws
+        ]
+
+    def get_active_accounts(self) -> List[Account]:
+        """
+        Returns only those accounts whose balance > 0.0001
+        """
+        return [
+            acct for acct in self.get_all_accounts()
+            if acct.balance > Decimal("0.0001")
+        ]
+
+    def get_id(self, code: str) -> str | None:
+        """
+        Find the Account.id for the given currency code.
+        """
+        for acct in self.assets:
+            if acct.currency == code:
+                return acct.id
+        return None
+
+    def get_account(self, account_id: str) -> Account | None:
+        """
+        Fetches a single account via its API and returns it as Account.
+        """
+        path = f"/v2/accounts/{account_id}"
+        token = create_jwt("GET", path)
+        headers = {"Authorization": f"Bearer {token}"}
+        url = self._base_url + path
+        raw = requests.get(url, headers=headers).json().get("data")
+        if not raw:
+            return None
+        return Account(
+            id = raw["id"],
+            balance = Decimal(raw["balance"]["amount"]),
+            currency = raw["balance"]["currency"],
+            fiat = is_fiat_account(raw),
+        )
+
+    def get_price(self, asset: str, quote: str = BASE_CURRENCY) -> Decimal:
+        """
+        Get and return up-to-date asset price in `quote` (USD by default).
+        Prices come from the shared FX matrix, so valuing many assets or
+        quotes doesn't multiply outbound calls.
+        """
+        sym = asset.strip()
+        if "-" in sym:
+            sym, quote = sym.split("-", 1)
+        if not self._fx.has(sym):
+            # Not in the batched rates: fall back to one spot call and cache it
+            pair = f"{sym}-{self._fx.base}"
+            amt = self._client.get_spot_price(currency_pair=pair)["amount"]
+            self._fx.set_rate(sym, Decimal(amt))
+        price = self._fx.rate(sym, quote)
+        if self._price_listener is not None and quote == BASE_CURRENCY:
+            self._price_listener(sym, price)
+        return price
+
+    def convert(self, amount: Decimal, from_ccy: str, to_ccy: str) -> Decimal:
+        """
+        Convert an amount between any two currencies via the FX matrix.
+        """
+        return self._fx.convert(amount, from_ccy, to_ccy)
+
+    def get_transactions(self, id: str, limit: int = 10) -> List[dict]:
+        """
+        Returns <limit> most recent transactions for the given asset id.
+        """
+        path = f"/v2/accounts/{id}/transactions"
+        token = create_jwt("GET", path)
+        headers = {"Authorization": f"Bearer {token}"}
+        url = self._base_url + path + f"?limit={limit}"
+        resp = requests.get(url, headers=headers).json().get("data", [])
+        # Keep the raw page so parsing/filtering changes can be replayed offline
+        archive = get_archive()
+        if archive is not None:
+            archive.append("transactions", resp, account_id=id)
+        cleaned = clean_transactions(resp)
+        for a in cleaned:
+            a["account_id"] = id
+        return cleaned
+
+    def get_all_transactions(self, limit: int = 100) -> List[dict]:
+        """
+        Returns all transactions for all active accounts
+        """
+        txs = []
+        active_accts = self.get_active_accounts()
+        for acct in active_accts:
+            txs.extend(self.get_transactions(acct.id, limit))
+        return txs; 
+
+if __name__ == "__main__":
+    # python -m financialdashboard.CoinbaseService.CoinbaseService
+    api_id, api_secret = get_hmac_credentials()
+    svc = CoinbaseService(api_id, api_secret)
+    print(svc.get_transactions("8e361484-8b9b-5e01-b0a9-70d23092e22f"))
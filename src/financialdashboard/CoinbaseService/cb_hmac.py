@@ -0,0 +1,9 @@
+from ..settings import get_settings
+
+
+def get_hmac_credentials():
+    settings = get_settings()
+    return (settings.coinbase_key_id, settings.coinbase_secret_id)
+
+if __name__ == '__main__':
+    print(get_hmac_credentials())
@@ -0,0 +1,17 @@
+from functools import lru_cache
+from ..settings import get_settings
+
+
+@lru_cache(maxsize=None)
+def _api_secret() -> str:
+    # Read the key file on the first signed request, not at import
+    with open(get_settings().coinbase_pem_path, "r") as f:
+        return f.read()
+
+def create_jwt(request_method: str, request_path: str):
+    from coinbase import jwt_generator
+
+    api_key = get_settings().coinbase_key_name
+    jwt_uri = jwt_generator.format_jwt_uri(request_method, request_path)
+    jwt_token = jwt_generator.build_rest_jwt(jwt_uri, api_key, _api_secret())
+    return jwt_token
@@ -0,0 +1,307 @@
+import json
+import logging
+import queue
+import threading
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Callable, Dict, List, Optional, Tuple
+from .db import SessionLocal
+from .models.alert import Alert, AlertKind, AlertDirection
+from .models.lot import Lot, load_lot_columns
+from .settings import get_settings
+from .fixedpoint import from_fixed
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class AlertSpec:
+    id: int
+    asset: str
+    kind: AlertKind
+    direction: AlertDirection
+    threshold: Decimal
+    account_id: Optional[str] = None
+
+
+class _Side:
+    """
+    Alerts of one direction for one asset, kept sorted by the
+    price at which they fire. Parallel lists so bisect works on
+    the bare Decimal thresholds.
+    """
+
+    def __init__(self):
+        self.prices: List[Decimal] = []
+        self.ids: List[int] = []
+
+    def add(self, price: Decimal, alert_id: int) -> None:
+        i = bisect_right(self.prices, price)
+        self.prices.insert(i, price)
+        self.ids.insert(i, alert_id)
+
+    def remove(self, price: Decimal, alert_id: int) -> None:
+        i = bisect_left(self.prices, price)
+        while i < len(self.prices) and self.prices[i] == price:
+            if self.ids[i] == alert_id:
+                del self.prices[i]
+                del self.ids[i]
+                return
+            i += 1
+
+    def pop_at_or_below(self, price: Decimal) -> List[int]:
+        i = bisect_right(self.prices, price)
+        fired = self.ids[:i]
+        del self.prices[:i], self.ids[:i]
+        return fired
+
+    def pop_at_or_above(self, price: Decimal) -> List[int]:
+        i = bisect_left(self.prices, price)
+        fired = self.ids[i:]
+        del self.prices[i:], self.ids[i:]
+        return fired
+
+
+class _AssetBook:
+    def __init__(self):
+        # "above" alerts fire once price >= trigger, "below" once price <= trigger
+        self.above = _Side()
+        self.below = _Side()
+
+    def side(self, direction: AlertDirection) -> _Side:
+        return self.above if direction == AlertDirection.above else self.below
+
+    def crossed(self, price: Decimal) -> List[int]:
+        return self.above.pop_at_or_below(price) + self.below.pop_at_or_above(price)
+
+
+class AlertEngine:
+    """
+    Holds every active alert in per-asset sorted books. A price tick
+    only touches the thresholds it crossed: O(log n + fired).
+
+    P&L alerts are indexed by the price at which the position's
+    unrealized gain hits the threshold, (threshold + cost) / remaining,
+    so they share the same books as plain price alerts.
+
+    The books are per process: with several API workers, an alert
+    created or changed through one worker is only evaluated by it.
+    """
+
+    def __init__(self, sink: "AlertSink"):
+        self._sink = sink
+        sink.on_failure = self.rearm
+        self._lock = threading.RLock()
+        self._loaded = False
+        self._specs: Dict[int, AlertSpec] = {}
+        self._indexed: Dict[int, Decimal] = {}
+        self._books: Dict[str, _AssetBook] = {}
+        # (asset, account_id or None) -> (remaining, cost of remaining)
+        self._positions: Dict[Tuple[str, Optional[str]], Tuple[Decimal, Decimal]] = {}
+
+    def load(self, db) -> None:
+        """
+        (Re)build the in-memory books from the Alert table and open lots.
+        """
+        alerts = db.query(Alert).filter(Alert.active.is_(True)).all()
+        with self._lock:
+            self._specs.clear()
+            self._indexed.clear()
+            self._books.clear()
+            self._positions = _load_positions(db)
+            for alert in alerts:
+                self._add(_spec_from_row(alert))
+            self._loaded = True
+
+    def refresh_positions(self, db) -> None:
+        """
+        Re-index P&L alerts after lots changed (e.g. after a sync).
+        """
+        positions = _load_positions(db)
+        with self._lock:
+            if not self._loaded:
+                return
+            self._positions = positions
+            for spec in list(self._specs.values()):
+                if spec.kind == AlertKind.pnl:
+                    self._unindex(spec)
+                    self._index(spec)
+
+    def upsert(self, alert: Alert) -> None:
+        with self._lock:
+            if not self._loaded:
+                return
+            self.discard(alert.id)
+            if alert.active:
+                self._add(_spec_from_row(alert))
+
+    def rearm(self, item: dict) -> None:
+        """
+        Put a fired alert whose delivery failed back into its book.
+        """
+        with self._lock:
+            if not self._loaded or item["alert_id"] in self._specs:
+                return
+            self._add(AlertSpec(
+                id = item["alert_id"],
+                asset = item["asset"],
+                kind = AlertKind(item["kind"]),
+                direction = AlertDirection(item["direction"]),
+                threshold = Decimal(item["threshold"]),
+                account_id = item["account_id"],
+            ))
+
+    def discard(self, alert_id: int) -> None:
+        with self._lock:
+            spec = self._specs.pop(alert_id, None)
+            if spec is not None:
+                self._unindex(spec)
+
+    def on_price(self, asset: str, price: Decimal) -> int:
+        """
+        Feed one price tick; queue every alert it triggers.
+        Returns the number of alerts fired.
+        """
+        self._ensure_loaded()
+        now = datetime.now(timezone.utc)
+        with self._lock:
+            book = self._books.get(asset)
+            if book is None:
+                return 0
+            fired = []
+            for alert_id in book.crossed(price):
+                self._indexed.pop(alert_id, None)
+                fired.append(self._specs.pop(alert_id))
+        for spec in fired:
+            self._sink.put({
+                "alert_id":     spec.id,
+                "asset":        spec.asset,
+                "kind":         spec.kind.value,
+                "direction":    spec.direction.value,
+                "threshold":    str(spec.threshold),
+                "account_id":   spec.account_id,
+                "price":        str(price),
+                "triggered_at": now.isoformat(),
+            })
+        return len(fired)
+
+    def _ensure_loaded(self) -> None:
+        if self._loaded:
+            return
+        db = SessionLocal()
+        try:
+            self.load(db)
+        finally:
+            db.close()
+
+    def _add(self, spec: AlertSpec) -> None:
+        self._specs[spec.id] = spec
+        self._index(spec)
+
+    def _index(self, spec: AlertSpec) -> None:
+        price = self._trigger_price(spec)
+        if price is None:
+            return
+        book = self._books.setdefault(spec.asset, _AssetBook())
+        book.side(spec.direction).add(price, spec.id)
+        self._indexed[spec.id] = price
+
+    def _unindex(self, spec: AlertSpec) -> None:
+        price = self._indexed.pop(spec.id, None)
+        if price is not None:
+            self._books[spec.asset].side(spec.direction).remove(price, spec.id)
+
+    def _trigger_price(self, spec: AlertSpec) -> Optional[Decimal]:
+        if spec.kind == AlertKind.price:
+            return spec.threshold
+        remaining, cost = self._positions.get(
+            (spec.asset, spec.account_id), (Decimal("0"), Decimal("0"))
+        )
+        # No open position: nothing to measure P&L against yet
+        if remaining <= 0:
+            return None
+        return (spec.threshold + cost) / remaining
+
+
+class AlertSink:
+    """
+    Delivers triggered alerts off the pricing path: a worker thread
+    appends each one as a JSON line to a local file and marks the
+    alert as triggered.
+    """
+
+    def __init__(self):
+        # Called with the item when delivery fails; set by AlertEngine
+        self.on_failure: Optional[Callable[[dict], None]] = None
+        self._queue: "queue.Queue[dict]" = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+
+    def put(self, item: dict) -> None:
+        self._ensure_worker()
+        self._queue.put(item)
+
+    def _ensure_worker(self) -> None:
+        if self._worker is not None:
+            return
+        with self._start_lock:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, daemon=True)
+                self._worker.start()
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            try:
+                self._deliver(item)
+            except Exception:
+                # The alert already left the in-memory book but is still
+                # active in the DB; put it back so the next crossing retries
+                logger.exception("Delivering alert %s failed", item.get("alert_id"))
+                if self.on_failure is not None:
+                    self.on_failure(item)
+            finally:
+                self._queue.task_done()
+
+    def _deliver(self, item: dict) -> None:
+        with open(get_settings().alerts_sink, "a") as f:
+            f.write(json.dumps(item) + "\n")
+        db = SessionLocal()
+        try:
+            alert = db.get(Alert, item["alert_id"])
+            if alert is not None:
+                alert.active = False
+                alert.triggered_at = datetime.fromisoformat(item["triggered_at"])
+                alert.triggered_price = Decimal(item["price"])
+                db.commit()
+        finally:
+            db.close()
+
+
+def _spec_from_row(alert: Alert) -> AlertSpec:
+    return AlertSpec(
+        id = alert.id,
+        asset = alert.asset,
+        kind = alert.kind,
+        direction = alert.direction,
+        threshold = alert.threshold,
+        account_id = alert.account_id,
+    )
+
+
+def _load_positions(db) -> Dict[Tuple[str, Optional[str]], Tuple[Decimal, Decimal]]:
+    cols = load_lot_columns(db, Lot.remaining > 0, keys=("asset", "account_id"))
+    positions = {}
+    for by in (("asset", "account_id"), "asset"):
+        remaining = cols.group_sums("remaining", by=by)
+        cost = cols.group_sums("cost_remaining", by=by)
+        for key, units in remaining.items():
+            # Per-asset totals are keyed (asset, None)
+            pos_key = key if isinstance(by, tuple) else (key, None)
+            positions[pos_key] = (from_fixed(units), from_fixed(cost[key]))
+    return positions
+
+
+alert_engine = AlertEngine(AlertSink())
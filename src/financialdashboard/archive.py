@@ -0,0 +1,311 @@
+"""
+Append-only, compressed archive of raw Coinbase API payloads.
+
+Every fetched page is written as its own gzip member at the end of the
+current segment file (`seg-000001.gz`, ...) and described by one line in
+`index.jsonl` (kind, account, time range, segment, offset, length), so a
+page can be read back with one seek and one decompress.
+
+    python -m financialdashboard.archive stats
+    python -m financialdashboard.archive replay [--account ID] [--reset]
+
+`replay` runs the normal sync pipeline against the archive instead of the
+API: no network, no API quota. On its own it only ingests transactions
+newer than each account's last sync; `--reset` first deletes the ingested
+transactions, lots, gains and sync markers (of one account, or all) so
+the whole history is re-derived, e.g. after a fix to the sync logic.
+"""
+import argparse
+import gzip
+import json
+import os
+import sys
+import threading
+from dataclasses import dataclass, asdict
+from datetime import datetime, timezone
+from decimal import Decimal
+from functools import lru_cache
+from typing import Iterator, List, Optional
+from dateutil.parser import isoparse
+from .settings import get_settings
+
+INDEX_FILE = "index.jsonl"
+
+
+@dataclass(frozen=True)
+class ArchiveEntry:
+    kind: str
+    account_id: Optional[str]
+    segment: int
+    offset: int
+    length: int
+    count: int
+    fetched_at: str
+    min_time: Optional[str] = None
+    max_time: Optional[str] = None
+
+
+class PayloadArchive:
+    def __init__(self, root: str, segment_bytes: int = 64 * 1024 * 1024):
+        self.root = root
+        self.segment_bytes = segment_bytes
+        self._lock = threading.Lock()
+        self._entries: Optional[List[ArchiveEntry]] = None
+
+    def append(self, kind: str, payload, account_id: Optional[str] = None) -> ArchiveEntry:
+        """
+        Persist one fetched page. For transaction pages the created_at range
+        is indexed so replays can skip segments outside a time window.
+        """
+        times = [
+            _utc_iso(item["created_at"])
+            for item in (payload if isinstance(payload, list) else [])
+            if isinstance(item, dict) and "created_at" in item
+        ]
+        blob = gzip.compress(
+            json.dumps(payload, separators=(",", ":")).encode(), compresslevel=6
+        )
+        with self._lock:
+            os.makedirs(self.root, exist_ok=True)
+            entries = self._load_index()
+            segment = entries[-1].segment if entries else 1
+            path = self._segment_path(segment)
+            if os.path.exists(path) and os.path.getsize(path) >= self.segment_bytes:
+                segment += 1
+                path = self._segment_path(segment)
+            with open(path, "ab") as f:
+                offset = f.tell()
+                f.write(blob)
+            entry = ArchiveEntry(
+                kind = kind,
+                account_id = account_id,
+                segment = segment,
+                offset = offset,
+                length = len(blob),
+                count = len(payload) if isinstance(payload, list) else 1,
+                fetched_at = datetime.now(timezone.utc).isoformat(),
+                min_time = min(times) if times else None,
+                max_time = max(times) if times else None,
+            )
+            # Index line goes last: a crash leaves unindexed bytes, never a dangling entry
+            with open(os.path.join(self.root, INDEX_FILE), "a") as f:
+                f.write(json.dumps(asdict(entry)) + "\n")
+            entries.append(entry)
+        return entry
+
+    def entries(
+        self,
+        kind: Optional[str] = None,
+        account_id: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+    ) -> List[ArchiveEntry]:
+        with self._lock:
+            entries = list(self._load_index())
+        since_iso = _utc_iso(since) if since else None
+        until_iso = _utc_iso(until) if until else None
+        return [
+            e for e in entries
+            if (kind is None or e.kind == kind)
+            and (account_id is None or e.account_id == account_id)
+            and not (since_iso and e.max_time and e.max_time < since_iso)
+            and not (until_iso and e.min_time and e.min_time > until_iso)
+        ]
+
+    def read(self, entry: ArchiveEntry):
+        with open(self._segment_path(entry.segment), "rb") as f:
+            f.seek(entry.offset)
+            return json.loads(gzip.decompress(f.read(entry.length)))
+
+    def stream(self, kind: str, **filters) -> Iterator[tuple]:
+        """
+        Yield (entry, payload) in archive order, one segment handle at a time.
+        """
+        handle, handle_segment = None, None
+        try:
+            for entry in self.entries(kind, **filters):
+                if entry.segment != handle_segment:
+                    if handle:
+                        handle.close()
+                    handle = open(self._segment_path(entry.segment), "rb")
+                    handle_segment = entry.segment
+                handle.seek(entry.offset)
+                yield entry, json.loads(gzip.decompress(handle.read(entry.length)))
+        finally:
+            if handle:
+                handle.close()
+
+    def _segment_path(self, segment: int) -> str:
+        return os.path.join(self.root, f"seg-{segment:06d}.gz")
+
+    def _load_index(self) -> List[ArchiveEntry]:
+        if self._entries is None:
+            path = os.path.join(self.root, INDEX_FILE)
+            entries = []
+            if os.path.exists(path):
+                with open(path) as f:
+                    entries = [ArchiveEntry(**json.loads(line)) for line in f if line.strip()]
+            self._entries = entries
+        return self._entries
+
+
+@lru_cache(maxsize=None)
+def get_archive() -> Optional[PayloadArchive]:
+    """
+    The configured archive, or None when ARCHIVE_PAYLOADS is off.
+    """
+    settings = get_settings()
+    if not settings.archive_payloads:
+        return None
+    return PayloadArchive(settings.archive_dir, settings.archive_segment_bytes)
+
+
+class ReplayService:
+    """
+    Stand-in for CoinbaseService that serves accounts, transactions and
+    exchange rates from the archive. `update_txns` runs on it unchanged.
+    """
+
+    def __init__(self, archive: PayloadArchive, account_id: Optional[str] = None):
+        from .fx import FxMatrix
+
+        self._archive = archive
+        self._account_id = account_id
+        self._fx = FxMatrix(ttl=float("inf"), fetch=self._latest_rates)
+
+    def get_all_accounts(self):
+        from .CoinbaseService.CoinbaseService import Account, is_fiat_account
+
+        accounts = {}
+        for _, page in self._archive.stream("accounts"):
+            for acct in page:
+                accounts[acct["id"]] = Account(
+                    id = acct["id"],
+                    balance = Decimal(acct["balance"]["amount"]),
+                    currency = acct["balance"]["currency"],
+                    fiat = is_fiat_account(acct),
+                )
+        # Accounts only ever seen through their transaction pages
+        for entry in self._archive.entries("transactions"):
+            if entry.account_id not in accounts:
+                accounts[entry.account_id] = Account(entry.account_id, Decimal("0"), "")
+        if self._account_id:
+            return [a for a in accounts.values() if a.id == self._account_id]
+        return list(accounts.values())
+
+    def get_transactions(self, id: str, limit: int = 10) -> List[dict]:
+        """
+        Every archived transaction for the account (limit is ignored;
+        replay serves the whole history), de-duplicated by id.
+        """
+        from .CoinbaseService.CoinbaseService import clean_transactions
+
+        seen = {}
+        for _, page in self._archive.stream("transactions", account_id=id):
+            for tx in page:
+                seen[tx["id"]] = tx
+        cleaned = clean_transactions(list(seen.values()))
+        for tx in cleaned:
+            tx["account_id"] = id
+        return cleaned
+
+    def get_price(self, asset: str, quote: str = "USD") -> Decimal:
+        return self._fx.rate(asset.strip(), quote)
+
+    def convert(self, amount: Decimal, from_ccy: str, to_ccy: str) -> Decimal:
+        return self._fx.convert(amount, from_ccy, to_ccy)
+
+    def _latest_rates(self, base: str) -> dict:
+        # Newest first: usually only the last rates page is decompressed
+        for entry in reversed(self._archive.entries("rates")):
+            payload = self._archive.read(entry)
+            if payload.get("currency") == base:
+                return payload["rates"]
+        raise LookupError(f"No archived {base} exchange rates to replay with")
+
+
+def reset_ingested(db, account_id: Optional[str] = None) -> dict:
+    """
+    Delete what syncs derived for one account (or every account) and its
+    AccountSync marker, then recompute the rollups from the gains left.
+    Flushes but does not commit.
+    """
+    from sqlalchemy import select
+    from .models.account_sync import AccountSync
+    from .models.gain import Gain
+    from .models.lot import Lot
+    from .models.transactions import Transaction
+    from .rollups import rebuild_rollups
+
+    def scoped(query, column):
+        return query if account_id is None else query.filter(column == account_id)
+
+    tx_ids = scoped(select(Transaction.tx_id), Transaction.account_id)
+    counts = {
+        "gains": db.query(Gain).filter(Gain.tx_id.in_(tx_ids))
+                   .delete(synchronize_session=False),
+        "lots": scoped(db.query(Lot), Lot.account_id).delete(synchronize_session=False),
+        "transactions": scoped(db.query(Transaction), Transaction.account_id)
+                          .delete(synchronize_session=False),
+        "syncs": scoped(db.query(AccountSync), AccountSync.account_id)
+                   .delete(synchronize_session=False),
+    }
+    db.flush()
+    rebuild_rollups(db)
+    return counts
+
+
+def _utc_iso(value) -> str:
+    if isinstance(value, str):
+        value = isoparse(value)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).isoformat()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("stats")
+    replay = sub.add_parser("replay")
+    replay.add_argument("--account", default=None)
+    replay.add_argument("--reset", action="store_true",
+                        help="delete ingested rows first and re-ingest everything")
+    args = parser.parse_args(argv)
+
+    settings = get_settings()
+    archive = PayloadArchive(settings.archive_dir, settings.archive_segment_bytes)
+    if args.command == "stats":
+        entries = archive.entries()
+        print(json.dumps({
+            "pages": len(entries),
+            "records": sum(e.count for e in entries),
+            "segments": len({e.segment for e in entries}),
+            "accounts": len({e.account_id for e in entries if e.account_id}),
+            "compressed_bytes": sum(e.length for e in entries),
+        }, indent=2))
+        return 0
+
+    from .cb_app import update_txns
+    from .db import SessionLocal
+
+    from .mirror import rebuild_mirror
+
+    db = SessionLocal()
+    try:
+        result = {}
+        if args.reset:
+            result["reset"] = reset_ingested(db, args.account)
+            db.commit()
+        result.update(update_txns(svc=ReplayService(archive, args.account), db=db))
+        if args.reset:
+            # Deletes bypass refresh_mirror; resync the mirror wholesale
+            rebuild_mirror(db)
+    finally:
+        db.close()
+    print(json.dumps(result))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
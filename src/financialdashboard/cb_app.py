@@ -0,0 +1,700 @@
+import asyncio
+import logging
+from datetime import date, datetime, timezone
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+from sqlalchemy.exc import IntegrityError
+from dateutil.parser import isoparse
+from decimal import Decimal
+from sqlalchemy import and_, func
+from .CoinbaseService.CoinbaseService import CoinbaseService
+from .CoinbaseService.cb_hmac      import get_hmac_credentials
+from .db                            import get_session, SessionLocal
+from .events                        import broker
+from .alerts                        import alert_engine
+from .reconcile                     import reconcile
+from .rollups                       import record_gain, rebuild_rollups, rollup_query
+from .fixedpoint                    import to_fixed, from_fixed, muldiv, mul_price, SCALE
+from .models.transactions           import Transaction, BrokerType, LOT_SIDES
+from .fx                            import BASE_CURRENCY
+from .archive                       import ReplayService, PayloadArchive, get_archive
+from .settings                      import get_settings
+from .mirror                        import get_read_session, refresh_mirror, rebuild_mirror
+from .models.account_sync           import AccountSync
+from .models.lot                    import Lot, load_lot_columns
+from .models.gain                   import Gain
+from .models.alert                  import Alert, AlertKind, AlertDirection
+from .models.gain_rollup            import GainRollup, RollupPeriod
+from typing import List, Optional
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+class AccountOut(BaseModel):
+    id: str
+    balance: Decimal
+    currency: str
+class AlertIn(BaseModel):
+    asset: str
+    kind: AlertKind = AlertKind.price
+    direction: AlertDirection
+    threshold: Decimal
+    account_id: Optional[str] = None
+    active: bool = True
+class PriceTick(BaseModel):
+    asset: str
+    price: Decimal
+def get_coinbase_service() -> CoinbaseService:
+    settings = get_settings()
+    if settings.replay_archive:
+        # Serve syncs from archived payloads instead of the API
+        archive = get_archive() or PayloadArchive(
+            settings.archive_dir, settings.archive_segment_bytes
+        )
+        return ReplayService(archive)
+    key, secret = get_hmac_credentials()
+    return CoinbaseService(key, secret, price_listener=alert_engine.on_price)
+@router.post("/transactions/cb_update")
+def update_txns(
+    svc: CoinbaseService = Depends(get_coinbase_service),
+    db: Session = Depends(get_session)
+):
+    inserted = 0
+    new_txs_out, new_tx_ids, closed_lot_ids, new_gains = [], [], [], []
+    upserted_lots = {}
+    all_syncs = { row.account_id: row 
+        for row in db.query(AccountSync).all() }
+    try:
+        accounts = svc.get_all_accounts()
+        fiat_codes = {BASE_CURRENCY} | {acct.currency for acct in accounts if acct.fiat}
+        for acct in accounts:
+            # Fiat wallets only hold the cash side of buys, sells and trades;
+            # the crypto leg in the asset's own wallet is what becomes a lot
+            if acct.fiat:
+                continue
+            sync = all_syncs.get(acct.id)     # O(1) in‐memory lookup, no SQL
+            since = sync.last_tx_time if sync else None
+            if since and since.tzinfo is None:
+                since = since.replace(tzinfo=timezone.utc) 
+            raw_txs = svc.get_transactions(acct.id, limit=250)
+            new_txs = []
+            for tx in raw_txs:
+                tx_time = isoparse(tx["created_at"])
+                if not since or tx_time > since:
+                    new_txs.append((tx_time, tx))
+            if not new_txs:
+                continue
+            new_txs.sort(key=lambda pair: pair[0])
+            for tx_time, tx in new_txs:
+                # Accounts known only from replayed tx pages carry no type
+                if tx["amount"]["currency"] in fiat_codes:
+                    continue
+                orm_tx = Transaction(
+                    tx_id    = tx["id"],
+                    asset    = tx["amount"]["currency"],
+                    quantity = abs(Decimal(tx["amount"]["amount"])),
+                    cost_usd   = actual_amt(tx, svc),
+                    tx_type  = tx_type_of(tx),
+                    tx_time  = tx_time,
+                    account_id = tx["account_id"],
+                    broker = BrokerType.coinbase
+                )
+                db.add(orm_tx)
+                try:
+                    db.flush()
+                    inserted += 1
+                    new_txs_out.append(format_transaction_response(orm_tx))
+                    new_tx_ids.append(orm_tx.tx_id)
+                except IntegrityError:
+                    # Already stored (e.g. a retried sync): its lot/gain exist,
+                    # and any that went missing are reconcile's to restore
+                    db.rollback()
+                    continue
+                side = LOT_SIDES.get(orm_tx.tx_type)
+                if side == "sell":
+                    touched, closed, gain = handle_sell(orm_tx, db)
+                    upserted_lots.update((lot.id, lot) for lot in touched)
+                    closed_lot_ids.extend(closed)
+                    new_gains.append(gain)
+                if side == "buy":
+                    lot = handle_buy(orm_tx, db)
+                    upserted_lots[lot.id] = lot
+            newest_time = new_txs[-1][0]
+            if not sync:
+                sync = AccountSync(
+                    account_id=acct.id, 
+                    asset=tx["amount"]["currency"],
+                    last_tx_time=newest_time
+                )
+                db.add(sync)
+                all_syncs[acct.id] = sync
+            else:
+                sync.last_tx_time = newest_time
+        db.commit()
+    except Exception:
+        # handle_buy/handle_sell commit per transaction, so part of a failed
+        # sync is already on the primary; push that part to the mirror too
+        db.rollback()
+        try:
+            refresh_mirror(
+                db, new_tx_ids, upserted_lots, closed_lot_ids, [g.id for g in new_gains]
+            )
+            alert_engine.refresh_positions(db)
+        except Exception:
+            logger.exception("Refresh after a failed sync failed")
+        raise
+    if inserted:
+        refresh_mirror(
+            db, new_tx_ids, upserted_lots, closed_lot_ids, [g.id for g in new_gains]
+        )
+        alert_engine.refresh_positions(db)
+    if inserted and broker.has_subscribers:
+        publish_sync_events(
+            svc, db, new_txs_out, upserted_lots, closed_lot_ids, new_gains
+        )
+    return {"new_transactions": inserted}
+def publish_sync_events(svc, db, new_txs, lots, closed_lot_ids, gains):
+    """
+    Push the deltas of a committed sync to dashboard subscribers
+    instead of making every client refetch full tables.
+    """
+    closed = set(closed_lot_ids)
+    # Keyed by id up front: lots closed later in the sync are deleted rows
+    open_lots = [lot for lot_id, lot in lots.items() if lot_id not in closed]
+    broker.publish("transactions", new_txs)
+    broker.publish("positions", {
+        "upserted": [format_lot_response(lot, svc) for lot in open_lots],
+        "closed":   sorted(closed),
+    })
+    realized = {}
+    for gain in gains:
+        realized[gain.broker.name] = realized.get(gain.broker.name, Decimal("0")) + gain.profit
+    broker.publish("closed_positions", [format_gain_response(g) for g in gains])
+    broker.publish("realized_gain", realized)
+    broker.publish("unrealized_gain", unrealized_by_broker(svc, db))
+def tx_type_of(tx):
+    """
+    Split crypto-to-crypto trades into the leg this account saw.
+    """
+    if tx["type"] == "trade":
+        return "trade_sell" if Decimal(tx["amount"]["amount"]) < 0 else "trade_buy"
+    return tx["type"]
+def actual_amt(tx, svc):
+    """
+    Compute actual amount of tx after fees, in USD. Non-USD amounts are
+    valued at the trade-time USD native_amount Coinbase sends with the
+    transaction, not at today's rates.
+    """
+    if tx["type"] in ("buy", "sell"):
+        detail = tx[tx["type"]]
+        money = detail["subtotal"]
+    else:
+        detail, money = {}, tx["native_amount"]
+    amount = abs(Decimal(money["amount"]))
+    if money["currency"] == BASE_CURRENCY:
+        return amount
+    native = tx.get("native_amount") or {}
+    if native.get("currency") == BASE_CURRENCY:
+        native_usd = abs(Decimal(native["amount"]))
+        total = detail.get("total") or {}
+        # native_amount covers the total incl. fees; keep the subtotal's share
+        if total.get("currency") == money["currency"] and Decimal(total["amount"]):
+            return native_usd * amount / abs(Decimal(total["amount"]))
+        return native_usd
+    # No trade-time USD value: today's FX rate, only approximate for older trades
+    return svc.convert(amount, money["currency"], BASE_CURRENCY)
+
+def handle_sell(tx, db):
+    """
+    Sell an asset matching a buy transaction with 
+    FIFO logic. Updating database entries and P&Ls 
+    accordingly.
+    """
+    # Matching runs on 1e-8 fixed-point ints; Decimals only at the DB boundary
+    qty_sold = to_fixed(tx.quantity)
+    proceeds = to_fixed(tx.cost_usd)
+    qty_to_sell = qty_sold
+    profit_total = 0
+    touched, closed = [], []
+    lots = (
+        db.query(Lot)
+          .filter(
+              and_(
+                  Lot.account_id == tx.account_id,
+                  Lot.asset      == tx.asset,
+                  Lot.remaining  > 0
+              )
+          )
+          # Same order as reconcile's (tx_time, tx_id) replay, ties included
+          .order_by(Lot.buy_time, Lot.tx_id)
+          .all()
+    )
+    for lot in lots:
+        if qty_to_sell <= 0:
+            break
+        remaining = to_fixed(lot.remaining)
+        match_qty = min(remaining, qty_to_sell)
+        profit_total += (
+            muldiv(match_qty, proceeds, qty_sold)
+            - muldiv(match_qty, to_fixed(lot.cost), to_fixed(lot.quantity))
+        )
+        remaining -= match_qty
+        lot.remaining = from_fixed(remaining)
+        if remaining == 0:
+            closed.append(lot.id)
+            db.delete(lot)
+        else:
+            touched.append(lot)
+        qty_to_sell -= match_qty
+    if qty_to_sell > 0:
+        raise ValueError(f"Not enough {tx.asset} to sell – {from_fixed(qty_to_sell)} units short")
+    total_gain = Gain(
+        tx_id = tx.tx_id,
+        account_id = tx.account_id,
+        asset = tx.asset,
+        quantity = tx.quantity,
+        proceeds = tx.cost_usd,
+        profit  = from_fixed(profit_total),
+        broker = BrokerType.coinbase,
+        matched_at = datetime.now(timezone.utc)
+    )
+    db.add(total_gain)
+    record_gain(db, total_gain, tx.tx_time)
+    db.commit()
+    return touched, closed, total_gain
+def handle_buy (tx, db):
+    """
+    Buy an asset and record it in transactions
+    """
+    buy_lot = Lot(
+        account_id = tx.account_id,
+        tx_id = tx.tx_id,
+        asset = tx.asset,
+        quantity = tx.quantity,
+        cost = tx.cost_usd,
+        remaining = tx.quantity,
+        broker = BrokerType.coinbase,
+        buy_time = tx.tx_time
+    )
+    db.add(buy_lot)
+    db.commit()
+    return buy_lot
+@router.post("/mirror/rebuild")
+def rebuild_read_mirror(db: Session = Depends(get_session)):
+    """
+    Full copy of transactions, lots and gains into the read mirror.
+    """
+    if not get_settings().mirror_url:
+        raise HTTPException(status_code=400, detail="MIRROR_URL is not configured")
+    return rebuild_mirror(db)
+@router.post("/reconcile")
+def reconcile_positions(
+    apply: bool = False,
+    workers: Optional[int] = None,
+    db: Session = Depends(get_session)
+):
+    """
+    Recompute lots and gains from transactions and report (or fix)
+    any drift from the stored rows.
+    """
+    report = reconcile(db, apply=apply, workers=workers)
+    if report["applied"]:
+        alert_engine.refresh_positions(db)
+    return report
+@router.get("/average_entry/{account_id}")
+def calculate_avg_entry(account_id: str, db: Session = Depends(get_read_session)):
+    """
+    Average the buy price (with weighting) of database 
+    entries corresponding to the account_id
+    """
+    cols = load_lot_columns(
+        db,
+        and_(
+            Lot.account_id == account_id,
+            Lot.remaining  > 0
+        ),
+    )
+    return from_fixed(muldiv(cols.total("cost"), SCALE, cols.total("quantity")))
+@router.get("/unrealized_gains")
+def unrealized_gains_total(
+    brokers: Optional[List[BrokerType]] = Query(default=None),
+    quote: str = BASE_CURRENCY,
+    svc: CoinbaseService = Depends(get_coinbase_service),
+    db: Session            = Depends(get_read_session),
+):
+    """
+    Total unrealized gain across all accounts & brokers, valued in `quote`.
+    """
+    criteria = [Lot.remaining > 0]
+    if brokers:
+        criteria.append(Lot.broker.in_(brokers))
+    return unrealized_totals(load_lot_columns(db, *criteria), svc, quote=quote)
+@router.get("/unrealized_gains/by_account/{account_id}")
+def unrealized_gains_by_account(
+    account_id: str,
+    quote: str = BASE_CURRENCY,
+    svc: CoinbaseService = Depends(get_coinbase_service),
+    db: Session            = Depends(get_read_session),
+):
+    """
+    Unrealized gain for a single account.
+    """
+    cols = load_lot_columns(db, Lot.remaining > 0, Lot.account_id == account_id)
+    return {
+        "account_id": account_id,
+        **unrealized_totals(cols, svc, quote=quote),
+    }
+def unrealized_totals(cols, svc, prices=None, quote=BASE_CURRENCY):
+    """
+    Cost, market value and unrealized gain of a LotColumns set in `quote`,
+    with one price per asset from the FX matrix.
+    """
+    if prices is None:
+        prices = {
+            asset: svc.get_price(asset, quote)
+            for asset in cols.group_sums("remaining")
+        }
+    # Cost basis is stored in USD
+    total_cost = to_fixed(
+        svc.convert(from_fixed(cols.total("cost_remaining")), BASE_CURRENCY, quote)
+    )
+    total_value = cols.market_value(prices)
+    return {
+        "quote":           quote,
+        "total_cost":      from_fixed(total_cost),
+        "market_value":    from_fixed(total_value),
+        "unrealized_gain": from_fixed(total_value - total_cost),
+    }
+@router.get("/realized_gains")
+def realized_gains(
+    brokers: Optional[List[BrokerType]] = Query(default=None),
+    db: Session = Depends(get_session)
+):
+    """
+    Sum up *all* realized gains across brokers/accounts from the yearly rollups.
+    """
+    total = rollup_query(
+        db, [func.coalesce(func.sum(GainRollup.profit), 0)],
+        RollupPeriod.year, brokers=brokers,
+    ).scalar()
+    
+    return {
+        "brokers": [b.value for b in brokers] if brokers else "all",
+        "realized_gain": total
+    }
+@router.get("/realized_gains/by_account/{account_id}")
+def get_account_realized_gains(account_id: str, db: Session = Depends(get_session)):
+    """
+    Sum realized gains for a single account from the yearly rollups.
+    """
+    total = rollup_query(
+        db, [func.coalesce(func.sum(GainRollup.profit), 0)],
+        RollupPeriod.year, account_id=account_id,
+    ).scalar()
+    return {"account_id": account_id, "realized_gain": total}
+@router.get("/realized_gains/by_period")
+def get_realized_gains_by_period(
+    period: RollupPeriod = RollupPeriod.month,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    asset: Optional[str] = None,
+    account_id: Optional[str] = None,
+    brokers: Optional[List[BrokerType]] = Query(default=None),
+    db: Session = Depends(get_session)
+):
+    """
+    Realized gains per day/month/year bucket, answered from rollups.
+    `start`/`end` are matched against the bucket's first day.
+    """
+    rows = (
+        rollup_query(
+            db,
+            [
+                GainRollup.period_start,
+                func.sum(GainRollup.quantity).label("quantity"),
+                func.sum(GainRollup.proceeds).label("proceeds"),
+                func.sum(GainRollup.profit).label("profit"),
+                func.sum(GainRollup.sells).label("sells"),
+            ],
+            period, start, end, brokers, asset, account_id,
+        )
+          .group_by(GainRollup.period_start)
+          .order_by(GainRollup.period_start)
+          .all()
+    )
+    return [
+        {
+            "period": period.value,
+            "period_start": row.period_start,
+            "quantity": row.quantity,
+            "proceeds": row.proceeds,
+            "realized_gain": row.profit,
+            "sells": row.sells,
+        }
+        for row in rows
+    ]
+@router.post("/realized_gains/rollups/rebuild")
+def rebuild_realized_gain_rollups(db: Session = Depends(get_session)):
+    """
+    Recompute all realized-gain rollups from the Gain table.
+    """
+    written = rebuild_rollups(db)
+    db.commit()
+    return {"rollups": written}
+@router.get("/active_positions")
+def get_unrealized_lots(
+    limit: int = 15, 
+    order: str = "desc",
+    brokers: Optional[List[BrokerType]] = Query(default=None),
+    svc: CoinbaseService = Depends(get_coinbase_service),
+    db: Session = Depends(get_read_session)
+):
+    """
+    Gets active positions
+    """
+    if order.lower() not in ["asc", "desc"]:
+        raise HTTPException(status_code=400, detail="Order must be 'asc' or 'desc'")
+    
+    query = db.query(Lot).filter(Lot.remaining > 0)
+    if brokers:
+        query = query.filter(Lot.broker.in_(brokers))
+    if order.lower() == "desc":
+        query = query.order_by(Lot.buy_time.desc())
+    else:
+        query = query.order_by(Lot.buy_time.asc())
+    
+    lots = query.limit(limit).all()
+    formatted_lots = []
+    for lot in lots:
+        formatted_lots.append(format_lot_response(lot, svc))
+    return formatted_lots
+def format_lot_response(lot, svc):
+    quantity = to_fixed(lot.quantity)
+    cost = to_fixed(lot.cost)
+    remaining = to_fixed(lot.remaining)
+    # Calculate effective cost basis (cost per unit)
+    effective_cost_basis = muldiv(cost, SCALE, quantity) if quantity > 0 else 0
+    
+    # Get current price and calculate unrealized gain
+    current_value = mul_price(remaining, svc.get_price(lot.asset))
+    cost_of_remaining = muldiv(cost, remaining, quantity) if quantity > 0 else 0
+    unrealized_gain = current_value - cost_of_remaining
+    
+    formatted_time = lot.buy_time.strftime("%B %d, %Y at %I:%M %p")
+    
+    return {
+        "id": lot.id,
+        "quantity": f"{lot.remaining:.8f}",
+        "effective_cost_basis": f"{from_fixed(effective_cost_basis):.2f}",
+        "cost_remaining": f"${from_fixed(cost_of_remaining):.2f}",
+        "broker": lot.broker.value.title(),
+        "buy_time": formatted_time,
+        # Sortable form of buy_time, so streamed diffs can keep the table ordered
+        "bought_at": lot.buy_time.isoformat(),
+        "unrealized_gain": f"${from_fixed(unrealized_gain):.2f}"
+    }
+@router.get("/closed_positions")
+def get_realized_positions(
+    limit: int = 15, 
+    order: str = "desc",
+    brokers: Optional[List[BrokerType]] = Query(default=None),
+    db: Session = Depends(get_read_session)
+):
+    """
+    Gets active positions
+    """
+    if order.lower() not in ["asc", "desc"]:
+        raise HTTPException(status_code=400, detail="Order must be 'asc' or 'desc'")
+    
+    query = db.query(Gain)
+    if brokers:
+        query = query.filter(Gain.broker.in_(brokers))
+    if order.lower() == "desc":
+        query = query.order_by(Gain.matched_at.desc())
+    else:
+        query = query.order_by(Gain.matched_at.asc())
+    
+    gains = query.limit(limit).all()
+    formatted_gains = []
+    for gain in gains:
+       formatted_gains.append(format_gain_response(gain)) 
+    return formatted_gains
+def format_gain_response(gain_data):
+    # Parse the datetime string and format it
+    formatted_date = gain_data.matched_at.strftime("%B %d, %Y at %I:%M %p")
+    
+    return {
+        "broker": gain_data.broker,
+        "asset": gain_data.asset,
+        "quantity": f"{gain_data.quantity:.8f}",
+        "profit": f"${gain_data.profit:.2f}",
+        "sold_at": formatted_date
+    }
+@router.get("/transactions")
+def get_transactions(
+    limit: int = 50,
+    order: str = "desc",
+    brokers: Optional[List[BrokerType]] = Query(default=None),
+    db: Session = Depends(get_read_session)
+):
+    query = db.query(Transaction)
+    if brokers:
+        query = query.filter(Transaction.broker.in_(brokers))
+    if order == "desc":
+        query = query.order_by(Transaction.tx_time.desc())
+    else:
+        query = query.order_by(Transaction.tx_time.asc())
+    
+    transactions = query.limit(limit).all()
+    
+    return [format_transaction_response(tx) for tx in transactions]
+def format_transaction_response(tx):
+    # Calculate price per unit
+    price_per_unit = tx.cost_usd / tx.quantity if tx.quantity > 0 else 0
+    
+    return {
+        "broker": tx.broker.value.title(),
+        "asset": tx.asset,
+        "transaction_type": tx.tx_type.replace('_', ' ').title(),
+        "quantity": f"{tx.quantity:.8f}",
+        "total_cost": f"${tx.cost_usd:.2f}",
+        "price_per_unit": f"${price_per_unit:.2f}",
+        "transaction_time": tx.tx_time.strftime("%B %d, %Y at %I:%M %p")
+    }
+def unrealized_by_broker(svc, db):
+    """
+    Unrealized gain split per broker so subscribers can re-total
+    whatever broker filter they currently display.
+    """
+    cols = load_lot_columns(db, Lot.remaining > 0, keys=("asset", "broker"))
+    prices = {
+        asset: svc.get_price(asset)
+        for asset in cols.group_sums("remaining")
+    }
+    totals = {}
+    for broker_name in cols.group_sums("remaining", by="broker"):
+        broker_cols = cols.where(cols.keys["broker"] == broker_name)
+        totals[broker_name] = unrealized_totals(broker_cols, svc, prices)
+    return totals
+@router.get("/events")
+async def stream_events(request: Request):
+    """
+    Server-sent events stream of incremental dashboard updates:
+    `transactions`, `positions`, `closed_positions`, `realized_gain`
+    and `unrealized_gain`.
+    """
+    sub = broker.subscribe()
+    _, queue = sub
+    async def event_source():
+        try:
+            yield "retry: 5000\n\n"
+            while not await request.is_disconnected():
+                try:
+                    yield await asyncio.wait_for(queue.get(), timeout=15)
+                except asyncio.TimeoutError:
+                    # Comment line keeps proxies from closing an idle stream
+                    yield ": keepalive\n\n"
+        finally:
+            broker.unsubscribe(sub)
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+async def watch_prices(interval: float = 30.0):
+    """
+    Recompute unrealized gain while anyone is subscribed and publish it
+    only when prices actually moved the totals.
+    """
+    last = None
+    while True:
+        await asyncio.sleep(interval)
+        if not broker.has_subscribers:
+            continue
+        try:
+            current = await run_in_threadpool(_current_unrealized)
+        except Exception:
+            logger.exception("Unrealized gain refresh failed")
+            continue
+        if current != last:
+            broker.publish("unrealized_gain", current)
+            last = current
+def _current_unrealized():
+    db = SessionLocal()
+    try:
+        return unrealized_by_broker(get_coinbase_service(), db)
+    finally:
+        db.close()
+@router.post("/alerts")
+def create_alert(body: AlertIn, db: Session = Depends(get_session)):
+    """
+    Create a price or P&L-threshold alert for an asset.
+    """
+    alert = Alert(**body.model_dump(), created_at=datetime.now(timezone.utc))
+    db.add(alert)
+    db.commit()
+    alert_engine.upsert(alert)
+    return format_alert_response(alert)
+@router.get("/alerts")
+def list_alerts(
+    asset: Optional[str] = None,
+    active: Optional[bool] = None,
+    db: Session = Depends(get_session)
+):
+    query = db.query(Alert)
+    if asset:
+        query = query.filter(Alert.asset == asset)
+    if active is not None:
+        query = query.filter(Alert.active.is_(active))
+    return [format_alert_response(a) for a in query.order_by(Alert.id).all()]
+@router.get("/alerts/{alert_id}")
+def get_alert(alert_id: int, db: Session = Depends(get_session)):
+    return format_alert_response(_get_alert_or_404(alert_id, db))
+@router.put("/alerts/{alert_id}")
+def update_alert(alert_id: int, body: AlertIn, db: Session = Depends(get_session)):
+    """
+    Replace an alert's definition; setting `active` re-arms a triggered one.
+    """
+    alert = _get_alert_or_404(alert_id, db)
+    for field, value in body.model_dump().items():
+        setattr(alert, field, value)
+    if alert.active:
+        alert.triggered_at = None
+        alert.triggered_price = None
+    db.commit()
+    alert_engine.upsert(alert)
+    return format_alert_response(alert)
+@router.delete("/alerts/{alert_id}")
+def delete_alert(alert_id: int, db: Session = Depends(get_session)):
+    alert = _get_alert_or_404(alert_id, db)
+    db.delete(alert)
+    db.commit()
+    alert_engine.discard(alert_id)
+    return {"deleted": alert_id}
+@router.post("/alerts/prices")
+def ingest_prices(ticks: List[PriceTick]):
+    """
+    Price feed entry point: evaluate alerts against a batch of ticks.
+    """
+    fired = sum(alert_engine.on_price(t.asset, t.price) for t in ticks)
+    return {"triggered": fired}
+def _get_alert_or_404(alert_id, db):
+    alert = db.get(Alert, alert_id)
+    if alert is None:
+        raise HTTPException(status_code=404, detail=f"Alert {alert_id} not found")
+    return alert
+def format_alert_response(alert):
+    return {
+        "id": alert.id,
+        "asset": alert.asset,
+        "kind": alert.kind.value,
+        "direction": alert.direction.value,
+        "threshold": alert.threshold,
+        "account_id": alert.account_id,
+        "active": alert.active,
+        "created_at": alert.created_at,
+        "triggered_at": alert.triggered_at,
+        "triggered_price": alert.triggered_price,
+    }
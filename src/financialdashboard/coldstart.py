@@ -0,0 +1,55 @@
+"""
+Cold-start budget check for the API service.
+
+    python -m financialdashboard.coldstart [--budget-ms 750]
+
+Imports the app in a fresh interpreter, reports the import time and
+fails if it exceeds the budget or if importing touched the database,
+the environment file or the Coinbase key file.
+"""
+import argparse
+import json
+import subprocess
+import sys
+
+_PROBE = """
+import json, time
+start = time.perf_counter()
+import financialdashboard.main
+elapsed = (time.perf_counter() - start) * 1000
+from financialdashboard import db, settings
+from financialdashboard.CoinbaseService import cb_jwt
+print(json.dumps({
+    "import_ms": elapsed,
+    "settings_loaded": settings.get_settings.cache_info().currsize > 0,
+    "engine_built": db.get_engine.cache_info().currsize > 0,
+    "pem_read": cb_jwt._api_secret.cache_info().currsize > 0,
+}))
+"""
+
+
+def measure() -> dict:
+    out = subprocess.run(
+        [sys.executable, "-c", _PROBE],
+        check=True, capture_output=True, text=True,
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--budget-ms", type=float, default=750.0)
+    args = parser.parse_args(argv)
+
+    result = measure()
+    print(json.dumps(result, indent=2))
+    failures = [k for k in ("settings_loaded", "engine_built", "pem_read") if result[k]]
+    if result["import_ms"] > args.budget_ms:
+        failures.append(f"import took {result['import_ms']:.0f}ms > {args.budget_ms:.0f}ms")
+    for failure in failures:
+        print(f"FAIL: {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,41 @@
+from functools import lru_cache
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy import create_engine
+from .settings import get_settings
+
+
+@lru_cache(maxsize=None)
+def get_engine():
+    '''
+    Build the engine on first use so importing the app never
+    touches the database. The first connection also brings the
+    schema up to date (see schema.py).
+    '''
+    from .schema import ensure_schema
+
+    settings = get_settings()
+    engine = create_engine(settings.database_url, echo=settings.db_echo, future=True)
+    ensure_schema(engine)
+    return engine
+
+@lru_cache(maxsize=None)
+def _session_factory():
+    return sessionmaker(bind=get_engine(),
+                    autoflush=False,
+                    autocommit=False,
+                    future=True)
+
+def SessionLocal():
+    return _session_factory()()
+
+def get_session():
+    '''
+    Utilize context manager semantics to create 
+    a DB instance and automatically commit/rollback and
+    close upon context loss.
+    '''
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
@@ -0,0 +1,68 @@
+import asyncio
+import json
+import threading
+from enum import Enum
+from typing import Any, Set, Tuple
+
+
+class EventBroker:
+    """
+    In-process fan-out of server-sent events. Publishers may run in
+    FastAPI's threadpool (sync endpoints), so every subscriber queue is
+    paired with the event loop that owns it and fed thread-safely.
+    """
+
+    def __init__(self, max_queue: int = 256):
+        self._max_queue = max_queue
+        self._lock = threading.Lock()
+        self._subscribers: Set[Tuple[asyncio.AbstractEventLoop, asyncio.Queue]] = set()
+
+    def subscribe(self) -> Tuple[asyncio.AbstractEventLoop, asyncio.Queue]:
+        """
+        Register a new subscriber on the running event loop.
+        """
+        sub = (asyncio.get_running_loop(), asyncio.Queue(self._max_queue))
+        with self._lock:
+            self._subscribers.add(sub)
+        return sub
+
+    def unsubscribe(self, sub) -> None:
+        with self._lock:
+            self._subscribers.discard(sub)
+
+    @property
+    def has_subscribers(self) -> bool:
+        return bool(self._subscribers)
+
+    def publish(self, event: str, data: Any) -> None:
+        """
+        Encode one SSE message and hand it to every subscriber.
+        Slow subscribers drop messages rather than block publishers.
+        """
+        message = format_sse(event, data)
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for loop, queue in subscribers:
+            loop.call_soon_threadsafe(_offer, queue, message)
+
+
+def _offer(queue: asyncio.Queue, message: str) -> None:
+    try:
+        queue.put_nowait(message)
+    except asyncio.QueueFull:
+        pass
+
+
+def format_sse(event: str, data: Any) -> str:
+    payload = json.dumps(data, default=_encode, separators=(",", ":"))
+    return f"event: {event}\ndata: {payload}\n\n"
+
+
+def _encode(obj: Any) -> Any:
+    # Match FastAPI's JSON encoding of enums and Decimals
+    if isinstance(obj, Enum):
+        return obj.value
+    return str(obj)
+
+
+broker = EventBroker()
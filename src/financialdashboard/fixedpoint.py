@@ -0,0 +1,154 @@
+from decimal import Decimal
+from fractions import Fraction
+from typing import Dict, Hashable, List, Tuple
+import numpy as np
+
+# Scaled integers at 1e-8, the same resolution as the Numeric(28,8) columns.
+# Decimals only exist at the DB and JSON boundaries.
+SCALE = 10**8
+
+
+def to_fixed(value) -> int:
+    """
+    Decimal/str/int -> integer count of 1e-8 units (half-even rounding).
+    """
+    if not isinstance(value, Decimal):
+        value = Decimal(str(value))
+    return int(value.scaleb(8).to_integral_value())
+
+
+def from_fixed(units: int) -> Decimal:
+    return Decimal(int(units)).scaleb(-8)
+
+
+def muldiv(a: int, b: int, c: int) -> int:
+    """
+    round(a * b / c) on Python ints: exact, no int64 overflow in the product.
+    """
+    q, r = divmod(a * b, c)
+    return q + 1 if 2 * r >= c else q
+
+
+def mul(a: int, b: int) -> int:
+    return muldiv(a, b, SCALE)
+
+
+def mul_price(units: int, price) -> int:
+    """
+    units * price in 1e-8 units, with price taken exactly (Decimal or
+    Fraction, never pre-rounded) so the product is rounded once.
+    """
+    ratio = Fraction(price)
+    return muldiv(units, ratio.numerator, ratio.denominator)
+
+
+def muldiv_columns(a: np.ndarray, b: np.ndarray, c: np.ndarray) -> np.ndarray:
+    """
+    Elementwise muldiv on int64 columns whose results fit in int64
+    (e.g. cost * remaining / quantity with remaining <= quantity).
+    a * b is split as (a // c) * b + (a % c) * b / c so it stays inside
+    int64; the rare rows where even that would overflow fall back to
+    Python ints.
+    """
+    out = np.zeros(len(a), dtype=np.int64)
+    ok = c > 0
+    safe_c = np.where(ok, c, 1)
+    q1, r1 = np.divmod(a, safe_c)
+    # Largest factor each row can multiply by without leaving int64
+    limit = np.iinfo(np.int64).max // np.maximum(b, 1)
+    fast = ok & (np.abs(q1) <= limit) & (r1 <= limit)
+    q2, r2 = np.divmod(np.where(fast, r1 * b, 0), safe_c)
+    rounded = q1 * np.where(fast, b, 0) + q2 + (r2 >= safe_c - r2)
+    out[fast] = rounded[fast]
+    for i in np.flatnonzero(ok & ~fast):
+        out[i] = muldiv(int(a[i]), int(b[i]), int(c[i]))
+    return out
+
+
+class LotColumns:
+    """
+    Open lots as int64 columns for vectorized aggregation.
+
+    Amounts arrive already scaled to 1e-8 integers from SQL (see
+    `models.lot.load_lot_columns`), so building the columns is a bulk
+    conversion rather than a per-lot Decimal round-trip. Grouping keys
+    are object arrays, factorized with np.unique. Market values multiply
+    the per-group remaining by one unrounded price per group, rounding once.
+    """
+
+    def __init__(self, keys: Dict[str, np.ndarray], quantity, cost, remaining):
+        self.keys = keys
+        self.quantity = np.asarray(quantity, dtype=np.int64)
+        self.cost = np.asarray(cost, dtype=np.int64)
+        self.remaining = np.asarray(remaining, dtype=np.int64)
+        self.cost_remaining = muldiv_columns(self.cost, self.remaining, self.quantity)
+
+    @classmethod
+    def from_rows(cls, rows: List[Tuple], key_names: Tuple[str, ...]) -> "LotColumns":
+        """
+        Rows of (*keys, quantity, cost, remaining), amounts in 1e-8 units.
+        """
+        n_keys = len(key_names)
+        columns = list(zip(*rows)) or [()] * (n_keys + 3)
+        keys = {}
+        for name, values in zip(key_names, columns):
+            keys[name] = np.empty(len(values), dtype=object)
+            keys[name][:] = values
+        quantity, cost, remaining = (
+            np.array(values, dtype=np.int64) for values in columns[n_keys:]
+        )
+        return cls(keys, quantity, cost, remaining)
+
+    def __len__(self) -> int:
+        return len(self.quantity)
+
+    def _factorize(self, by) -> Tuple[list, np.ndarray]:
+        """
+        Group labels and one group code per row for a key name or names.
+        """
+        names = (by,) if isinstance(by, str) else tuple(by)
+        parts = [np.unique(self.keys[name], return_inverse=True) for name in names]
+        if len(parts) == 1:
+            uniq, codes = parts[0]
+            return list(uniq), codes
+        dims = [len(uniq) for uniq, _ in parts]
+        flat = np.ravel_multi_index([codes for _, codes in parts], dims)
+        groups, codes = np.unique(flat, return_inverse=True)
+        labels = [
+            tuple(uniq[i] for (uniq, _), i in zip(parts, index))
+            for index in zip(*np.unravel_index(groups, dims))
+        ]
+        return labels, codes
+
+    def group_sums(self, column: str, by="asset") -> Dict[Hashable, int]:
+        """
+        Sum one column grouped by a key name, or a tuple of key names.
+        """
+        if not len(self):
+            return {}
+        labels, codes = self._factorize(by)
+        sums = np.zeros(len(labels), dtype=np.int64)
+        np.add.at(sums, codes, getattr(self, column))
+        return {label: int(total) for label, total in zip(labels, sums)}
+
+    def where(self, mask: np.ndarray) -> "LotColumns":
+        """
+        Rows selected by a boolean mask, as a new LotColumns.
+        """
+        subset = LotColumns.__new__(LotColumns)
+        subset.keys = {name: values[mask] for name, values in self.keys.items()}
+        for column in ("quantity", "cost", "remaining", "cost_remaining"):
+            setattr(subset, column, getattr(self, column)[mask])
+        return subset
+
+    def total(self, column: str) -> int:
+        return int(getattr(self, column).sum())
+
+    def market_value(self, prices: Dict[str, Decimal], by: str = "asset") -> int:
+        """
+        Sum of remaining * price, with one unrounded price per asset.
+        """
+        return sum(
+            mul_price(remaining, prices[asset])
+            for asset, remaining in self.group_sums("remaining", by=by).items()
+        )
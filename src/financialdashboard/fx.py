@@ -0,0 +1,105 @@
+import threading
+import time
+from decimal import Decimal
+from typing import Callable, Dict, Optional
+import requests
+from .settings import get_settings
+
+# Costs are stored in USD (Transaction.cost_usd), so USD is the pivot
+BASE_CURRENCY = "USD"
+RATES_URL = "https://api.coinbase.com/v2/exchange-rates"
+
+
+class FxMatrix:
+    """
+    Cross rates for every currency Coinbase quotes, filled by one batched
+    exchange-rates call and cached for `ttl` seconds. Any pair is derived
+    by triangulating through the base currency, so valuing a portfolio in
+    any quote costs at most one outbound request per refresh.
+    """
+
+    def __init__(
+        self,
+        base: str = BASE_CURRENCY,
+        ttl: Optional[float] = None,
+        fetch: Optional[Callable[[str], dict]] = None,
+    ):
+        self.base = base
+        self._ttl = ttl
+        self._fetch = fetch or _fetch_rates
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        # units of currency per 1 base
+        self._rates: Dict[str, Decimal] = {}
+        self._fetched_at = 0.0
+
+    @property
+    def ttl(self) -> float:
+        return self._ttl if self._ttl is not None else get_settings().fx_ttl_seconds
+
+    def refresh(self) -> None:
+        raw = self._fetch(self.base)
+        rates = {ccy: Decimal(r) for ccy, r in raw.items() if Decimal(r) > 0}
+        rates[self.base] = Decimal("1")
+        with self._lock:
+            self._rates = rates
+            self._fetched_at = time.monotonic()
+
+    def set_rate(self, currency: str, base_price: Decimal) -> None:
+        """
+        Add a currency the batch didn't include, given its price in base.
+        """
+        self._ensure_fresh()
+        with self._lock:
+            self._rates[currency] = Decimal("1") / base_price
+
+    def snapshot(self) -> dict:
+        """
+        Current rates in the exchange-rates payload shape, for archiving.
+        """
+        self._ensure_fresh()
+        with self._lock:
+            rates = {ccy: str(rate) for ccy, rate in self._rates.items()}
+        return {"currency": self.base, "rates": rates}
+
+    def has(self, currency: str) -> bool:
+        self._ensure_fresh()
+        return currency == self.base or currency in self._rates
+
+    def rate(self, from_ccy: str, to_ccy: str) -> Decimal:
+        """
+        Units of `to_ccy` per one `from_ccy`.
+        """
+        if from_ccy == to_ccy:
+            return Decimal("1")
+        self._ensure_fresh()
+        rates = self._rates
+        try:
+            return rates[to_ccy] / rates[from_ccy]
+        except KeyError as e:
+            raise LookupError(f"No exchange rate for {e.args[0]}") from None
+
+    def convert(self, amount: Decimal, from_ccy: str, to_ccy: str) -> Decimal:
+        if from_ccy == to_ccy:
+            return amount
+        return amount * self.rate(from_ccy, to_ccy)
+
+    def _is_fresh(self) -> bool:
+        return bool(self._rates) and time.monotonic() - self._fetched_at <= self.ttl
+
+    def _ensure_fresh(self) -> None:
+        if self._is_fresh():
+            return
+        # One fetch per expiry, however many threads are valuing at once
+        with self._refresh_lock:
+            if not self._is_fresh():
+                self.refresh()
+
+
+def _fetch_rates(base: str) -> dict:
+    resp = requests.get(RATES_URL, params={"currency": base}, timeout=10)
+    resp.raise_for_status()
+    return resp.json()["data"]["rates"]
+
+
+fx_matrix = FxMatrix()
@@ -0,0 +1,21 @@
+import asyncio
+from contextlib import asynccontextmanager
+from fastapi import FastAPI
+from .cb_app import router, watch_prices
+from .settings import get_settings
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Background price watcher feeding the /events stream
+    watcher = asyncio.create_task(watch_prices(get_settings().price_poll_seconds))
+    yield
+    watcher.cancel()
+
+app = FastAPI(
+    title="My Crypto Dashboard",
+    version="0.1.0",
+    lifespan=lifespan
+)
+
+# Mount all of your endpoints under the router
+app.include_router(router)
@@ -0,0 +1,178 @@
+"""
+Embedded SQLite read mirror of transactions, Lot and Gain.
+
+Enabled by MIRROR_URL (e.g. sqlite:///mirror.db). The first use copies
+the primary tables over; after that syncs push their changes after
+commit, and read endpoints query the mirror so scans and aggregations
+never contend with ingestion on the primary database.
+
+    python -m financialdashboard.mirror rebuild
+"""
+import sys
+from functools import lru_cache
+from typing import Iterable
+from datetime import datetime, timezone
+from sqlalchemy import Column, MetaData, String, Table, create_engine, event, select
+from sqlalchemy.orm import sessionmaker
+from .db import SessionLocal
+from .settings import get_settings
+from .models.transactions import Transaction
+from .models.lot import Lot
+from .models.gain import Gain
+
+MIRRORED = (Transaction, Lot, Gain)
+_CHUNK = 5_000
+
+# One row, written by every full rebuild: an unseeded mirror has none
+_state = Table(
+    "mirror_state", MetaData(),
+    Column("key", String(32), primary_key=True),
+    Column("value", String(64), nullable=False),
+)
+
+
+@lru_cache(maxsize=None)
+def get_mirror_engine():
+    """
+    The mirror engine with its tables created and seeded from the
+    primary, or None when not configured.
+    """
+    url = get_settings().mirror_url
+    if not url:
+        return None
+    engine = create_engine(url, future=True)
+    if engine.dialect.name != "sqlite":
+        raise ValueError(f"MIRROR_URL must be a sqlite:// URL, got {url!r}")
+
+    @event.listens_for(engine, "connect")
+    def _pragmas(dbapi_conn, _):
+        # WAL: readers keep their snapshot while a refresh is writing
+        cursor = dbapi_conn.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.close()
+
+    for model in MIRRORED:
+        model.metadata.create_all(engine, tables=[model.__table__])
+    _state.metadata.create_all(engine)
+    with engine.connect() as conn:
+        seeded = conn.execute(select(_state.c.value)).first() is not None
+    if not seeded:
+        # Never serve reads from empty tables
+        primary_db = SessionLocal()
+        try:
+            _rebuild(engine, primary_db)
+        finally:
+            primary_db.close()
+    return engine
+
+
+@lru_cache(maxsize=None)
+def _mirror_session_factory():
+    return sessionmaker(bind=get_mirror_engine(),
+                    autoflush=False,
+                    autocommit=False,
+                    future=True)
+
+
+def mirror_enabled() -> bool:
+    return get_mirror_engine() is not None
+
+
+def get_read_session():
+    '''
+    Session for read-only endpoints: the mirror when configured,
+    otherwise the primary database.
+    '''
+    session = _mirror_session_factory()() if mirror_enabled() else SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+def _copy(primary_db, mirror_conn, model, where=None) -> int:
+    """
+    Upsert rows of `model` from the primary into the mirror, in chunks.
+    """
+    table = model.__table__
+    query = select(table)
+    if where is not None:
+        query = query.where(where)
+    upsert = table.insert().prefix_with("OR REPLACE")
+    copied = 0
+    result = primary_db.execute(query.execution_options(yield_per=_CHUNK))
+    for chunk in result.mappings().partitions(_CHUNK):
+        mirror_conn.execute(upsert, [dict(row) for row in chunk])
+        copied += len(chunk)
+    return copied
+
+
+def refresh_mirror(
+    primary_db,
+    tx_ids: Iterable[str] = (),
+    lot_ids: Iterable[int] = (),
+    closed_lot_ids: Iterable[int] = (),
+    gain_ids: Iterable[int] = (),
+) -> None:
+    """
+    Apply one committed sync's changes to the mirror in a single
+    mirror transaction.
+    """
+    engine = get_mirror_engine()
+    if engine is None:
+        return
+    tx_ids, lot_ids = list(tx_ids), list(lot_ids)
+    closed_lot_ids, gain_ids = list(closed_lot_ids), list(gain_ids)
+    with engine.begin() as conn:
+        if tx_ids:
+            _copy(primary_db, conn, Transaction, Transaction.tx_id.in_(tx_ids))
+        if lot_ids:
+            _copy(primary_db, conn, Lot, Lot.id.in_(lot_ids))
+        if closed_lot_ids:
+            conn.execute(Lot.__table__.delete().where(Lot.id.in_(closed_lot_ids)))
+        if gain_ids:
+            _copy(primary_db, conn, Gain, Gain.id.in_(gain_ids))
+
+
+def rebuild_mirror(primary_db) -> dict:
+    """
+    Replace the mirror's contents with a full copy of the primary tables.
+    """
+    engine = get_mirror_engine()
+    if engine is None:
+        return {}
+    return _rebuild(engine, primary_db)
+
+
+def _rebuild(engine, primary_db) -> dict:
+    counts = {}
+    with engine.begin() as conn:
+        for model in MIRRORED:
+            conn.execute(model.__table__.delete())
+            counts[model.__tablename__] = _copy(primary_db, conn, model)
+        conn.execute(_state.delete())
+        conn.execute(_state.insert().values(
+            key="rebuilt_at", value=datetime.now(timezone.utc).isoformat()
+        ))
+    return counts
+
+
+def main(argv=None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    if argv != ["rebuild"]:
+        print(__doc__.strip().splitlines()[-1].strip(), file=sys.stderr)
+        return 2
+    if not mirror_enabled():
+        print("MIRROR_URL is not set", file=sys.stderr)
+        return 1
+    db = SessionLocal()
+    try:
+        print(rebuild_mirror(db))
+    finally:
+        db.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,34 @@
+from sqlalchemy import (
+    Column,
+    Integer,
+    String,
+    Numeric,
+    Boolean,
+    DateTime,
+    Enum as SQLEnum,
+)
+from sqlalchemy.orm import declarative_base
+from enum import Enum
+
+Base = declarative_base()
+
+class AlertKind(Enum):
+    price = "price"
+    pnl = "pnl"
+
+class AlertDirection(Enum):
+    above = "above"
+    below = "below"
+
+class Alert(Base):
+    __tablename__ = "Alert"
+    id              = Column(Integer, primary_key=True, autoincrement=True)
+    asset           = Column(String(64), nullable=False, index=True)
+    kind            = Column(SQLEnum(AlertKind), nullable=False)
+    direction       = Column(SQLEnum(AlertDirection), nullable=False)
+    threshold       = Column(Numeric(28,8), nullable=False)
+    account_id      = Column(String(64), nullable=True)
+    active          = Column(Boolean, nullable=False, default=True)
+    created_at      = Column(DateTime(timezone=True), nullable=False)
+    triggered_at    = Column(DateTime(timezone=True), nullable=True)
+    triggered_price = Column(Numeric(28,8), nullable=True)
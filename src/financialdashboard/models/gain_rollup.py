@@ -0,0 +1,35 @@
+from sqlalchemy import (
+    Column,
+    String,
+    Integer,
+    Numeric,
+    Date,
+    Enum as SQLEnum,
+    PrimaryKeyConstraint,
+)
+from sqlalchemy.orm import declarative_base
+from enum import Enum
+from .transactions import BrokerType
+
+Base = declarative_base()
+
+class RollupPeriod(Enum):
+    day = "day"
+    month = "month"
+    year = "year"
+
+class GainRollup(Base):
+    __tablename__ = "GainRollup"
+    period       = Column(SQLEnum(RollupPeriod), nullable=False)
+    period_start = Column(Date, nullable=False)
+    asset        = Column(String(64), nullable=False)
+    account_id   = Column(String(64), nullable=False)
+    broker       = Column(SQLEnum(BrokerType), nullable=False)
+    quantity     = Column(Numeric(28,8), nullable=False, default=0)
+    proceeds     = Column(Numeric(28,8), nullable=False, default=0)
+    profit       = Column(Numeric(28,8), nullable=False, default=0)
+    sells        = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        PrimaryKeyConstraint("period", "period_start", "asset", "account_id", "broker"),
+    )
@@ -0,0 +1,45 @@
+from sqlalchemy import (
+    Column,
+    Integer,
+    String,
+    DateTime,
+    Enum as SQLEnum,
+    PrimaryKeyConstraint,
+    type_coerce,
+)
+from sqlalchemy.orm import declarative_base
+from .types import Amount, fixed_units
+from ..fixedpoint import LotColumns
+from .transactions import BrokerType
+Base = declarative_base()
+
+class Lot(Base):
+    __tablename__ = "Lot"
+    id          = Column(Integer, primary_key=True, autoincrement=True)
+    account_id  = Column(String(64), nullable=False)
+    tx_id       = Column(String(64), nullable=False)
+    asset       = Column(String(64), nullable=False)
+    quantity    = Column(Amount, nullable=False)
+    cost    = Column(Amount, nullable=False)
+    remaining   = Column(Amount, nullable=False)
+    broker     = Column(SQLEnum(BrokerType), nullable=False)
+    buy_time    = Column(DateTime(timezone=True), nullable=False)
+
+
+def load_lot_columns(db, *criteria, keys=("asset",)) -> LotColumns:
+    """
+    Lots matching `criteria` as LotColumns, keyed by the named Lot
+    columns. Amounts are scaled in SQL and keys read as plain strings.
+    """
+    dialect = db.get_bind().dialect
+    rows = (
+        db.query(
+            *(type_coerce(getattr(Lot, name), String).label(name) for name in keys),
+            fixed_units(Lot.quantity, dialect),
+            fixed_units(Lot.cost, dialect),
+            fixed_units(Lot.remaining, dialect),
+        )
+          .filter(*criteria)
+          .all()
+    )
+    return LotColumns.from_rows(rows, keys)
@@ -2,12 +2,12 @@ import os
 from sqlalchemy import (
     Column,
     String,
-    Numeric,
     DateTime,
     Enum as SQLEnum,
     PrimaryKeyConstraint,
 )
 from sqlalchemy.orm import declarative_base
+from .types import Amount
 from enum import Enum
 
 Base = declarative_base()
@@ -16,14 +16,23 @@ class BrokerType(Enum):
     coinbase = "Coinbase"
     schwab = "Schwab"
 
+# tx_type -> the lot side it represents. Crypto-to-crypto trades are stored
+# as one leg per account: trade_sell on the source, trade_buy on the target.
+LOT_SIDES = {
+    "buy":        "buy",
+    "trade_buy":  "buy",
+    "sell":       "sell",
+    "trade_sell": "sell",
+}
+
 
 class Transaction(Base):
     __tablename__ = "transactions"
 
     tx_id    = Column(String(64), primary_key=True)
     asset    = Column(String(10), nullable=False)
-    quantity = Column(Numeric(28, 8), nullable=False)
-    cost_usd = Column(Numeric(28, 8), nullable=False)
+    quantity = Column(Amount, nullable=False)
+    cost_usd = Column(Amount, nullable=False)
     tx_type = Column(String(32), nullable=False)
     tx_time  = Column(DateTime, nullable=False)
     account_id = Column(String(64), nullable=False)    
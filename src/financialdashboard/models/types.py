@@ -0,0 +1,34 @@
+from sqlalchemy import BigInteger, Numeric, cast, type_coerce
+from sqlalchemy.types import TypeDecorator
+from ..fixedpoint import SCALE, to_fixed, from_fixed
+
+
+class ScaledInteger(TypeDecorator):
+    """
+    Numeric(28,8) stored as an integer count of 1e-8 units. SQLite has no
+    exact decimal type, so the read mirror keeps amounts as int64 instead
+    of lossy REALs.
+    """
+    impl = BigInteger
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        return None if value is None else to_fixed(value)
+
+    def process_result_value(self, value, dialect):
+        return None if value is None else from_fixed(value)
+
+
+# Exact decimal on MySQL, scaled integer on the SQLite mirror
+Amount = Numeric(28, 8).with_variant(ScaledInteger(), "sqlite")
+
+
+def fixed_units(column, dialect):
+    """
+    SQL expression for an Amount column as an integer count of 1e-8 units,
+    so bulk readers skip the per-row Decimal conversion.
+    """
+    if dialect.name == "sqlite":
+        # Already stored scaled; read the raw integer
+        return type_coerce(column, BigInteger)
+    return cast(column * SCALE, BigInteger)
@@ -0,0 +1,325 @@
+"""
+Recompute Lot and Gain rows from the transactions table and diff them
+against what is stored.
+
+    python -m financialdashboard.reconcile [--apply] [--workers N]
+
+Each (account_id, asset) history is replayed in (tx_time, tx_id) order
+with the same FIFO rules as `handle_sell`, which drains lots by
+(buy_time, tx_id); partitions are spread across a process pool. `--apply` writes
+the fixes, and the realized-gain rollups, in a single transaction.
+"""
+import argparse
+import json
+import os
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, asdict, field
+from datetime import datetime, timezone
+from decimal import Decimal
+from itertools import groupby
+from typing import Deque, Dict, List, Optional, Tuple
+from .db import SessionLocal
+from .models.transactions import Transaction, BrokerType, LOT_SIDES
+from .models.lot import Lot
+from .models.gain import Gain
+from .fixedpoint import to_fixed, from_fixed, muldiv
+from .rollups import rebuild_rollups
+from .mirror import rebuild_mirror
+
+
+@dataclass(frozen=True)
+class TxRow:
+    tx_id: str
+    account_id: str
+    asset: str
+    tx_type: str
+    # 1e-8 fixed-point units: exact and cheap to ship to worker processes
+    quantity: int
+    cost_usd: int
+    tx_time: datetime
+    broker: str
+
+
+@dataclass
+class ExpectedLot:
+    tx_id: str
+    account_id: str
+    asset: str
+    quantity: Decimal
+    cost: Decimal
+    remaining: Decimal
+    broker: str
+    buy_time: datetime
+
+
+@dataclass
+class ExpectedGain:
+    tx_id: str
+    account_id: str
+    asset: str
+    quantity: Decimal
+    proceeds: Decimal
+    profit: Decimal
+    broker: str
+    matched_at: datetime
+
+
+@dataclass
+class PartitionResult:
+    lots: List[ExpectedLot] = field(default_factory=list)
+    gains: List[ExpectedGain] = field(default_factory=list)
+    shortfalls: List[dict] = field(default_factory=list)
+
+
+def rebuild_partition(txs: List[TxRow]) -> PartitionResult:
+    """
+    FIFO-match one (account_id, asset) history, ordered by tx_time.
+    """
+    result = PartitionResult()
+    # [buy tx, remaining units], oldest first; FIFO only ever drains the front
+    open_lots: Deque[list] = deque()
+    for tx in txs:
+        side = LOT_SIDES.get(tx.tx_type)
+        if side == "buy":
+            open_lots.append([tx, tx.quantity])
+        elif side == "sell":
+            qty_to_sell = tx.quantity
+            profit_total = 0
+            # (lot, units taken); applied only once the sell is fully covered
+            matches = []
+            for lot in open_lots:
+                if qty_to_sell <= 0:
+                    break
+                buy, remaining = lot
+                match_qty = min(remaining, qty_to_sell)
+                profit_total += (
+                    muldiv(match_qty, tx.cost_usd, tx.quantity)
+                    - muldiv(match_qty, buy.cost_usd, buy.quantity)
+                )
+                matches.append((lot, match_qty))
+                qty_to_sell -= match_qty
+            if qty_to_sell > 0:
+                # handle_sell rolls back a short sell, so the lots stay as they were
+                result.shortfalls.append({
+                    "tx_id": tx.tx_id,
+                    "account_id": tx.account_id,
+                    "asset": tx.asset,
+                    "short": str(from_fixed(qty_to_sell)),
+                })
+                continue
+            # Every match but the last used its lot up entirely
+            for _ in matches[:-1]:
+                open_lots.popleft()
+            if matches:
+                lot, match_qty = matches[-1]
+                lot[1] -= match_qty
+                if lot[1] == 0:
+                    open_lots.popleft()
+            result.gains.append(ExpectedGain(
+                tx_id = tx.tx_id,
+                account_id = tx.account_id,
+                asset = tx.asset,
+                quantity = from_fixed(tx.quantity),
+                proceeds = from_fixed(tx.cost_usd),
+                profit = from_fixed(profit_total),
+                broker = tx.broker,
+                matched_at = tx.tx_time,
+            ))
+    result.lots = [
+        ExpectedLot(
+            tx_id = buy.tx_id,
+            account_id = buy.account_id,
+            asset = buy.asset,
+            quantity = from_fixed(buy.quantity),
+            cost = from_fixed(buy.cost_usd),
+            remaining = from_fixed(remaining),
+            broker = buy.broker,
+            buy_time = buy.tx_time,
+        )
+        for buy, remaining in open_lots
+    ]
+    return result
+
+
+def rebuild_partitions(partitions: List[List[TxRow]]) -> PartitionResult:
+    """
+    Worker entry point: rebuild a batch of partitions in one task so
+    small histories don't pay one IPC round-trip each.
+    """
+    merged = PartitionResult()
+    for txs in partitions:
+        part = rebuild_partition(txs)
+        merged.lots.extend(part.lots)
+        merged.gains.extend(part.gains)
+        merged.shortfalls.extend(part.shortfalls)
+    return merged
+
+
+def load_partitions(db) -> List[List[TxRow]]:
+    rows = (
+        db.query(
+            Transaction.tx_id,
+            Transaction.account_id,
+            Transaction.asset,
+            Transaction.tx_type,
+            Transaction.quantity,
+            Transaction.cost_usd,
+            Transaction.tx_time,
+            Transaction.broker,
+        )
+          .filter(Transaction.tx_type.in_(LOT_SIDES))
+          .order_by(
+              Transaction.account_id,
+              Transaction.asset,
+              Transaction.tx_time,
+              Transaction.tx_id,
+          )
+          .yield_per(10_000)
+    )
+    txs = (
+        TxRow(r.tx_id, r.account_id, r.asset, r.tx_type, to_fixed(r.quantity),
+              to_fixed(r.cost_usd), _utc(r.tx_time), r.broker.name)
+        for r in rows
+    )
+    return [list(g) for _, g in groupby(txs, key=lambda t: (t.account_id, t.asset))]
+
+
+def rebuild(db, workers: Optional[int] = None) -> Tuple[PartitionResult, int]:
+    partitions = load_partitions(db)
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(partitions) < 2:
+        return rebuild_partitions(partitions), len(partitions)
+    # Round-robin batches; partitions arrive sorted by key, not by size
+    batches = [partitions[i::workers * 4] for i in range(workers * 4)]
+    merged = PartitionResult()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for part in pool.map(rebuild_partitions, [b for b in batches if b]):
+            merged.lots.extend(part.lots)
+            merged.gains.extend(part.gains)
+            merged.shortfalls.extend(part.shortfalls)
+    return merged, len(partitions)
+
+
+_LOT_FIELDS = ("account_id", "asset", "quantity", "cost", "remaining", "broker", "buy_time")
+_GAIN_FIELDS = ("account_id", "asset", "quantity", "proceeds", "profit", "broker")
+
+
+def _stored_value(row, name):
+    value = getattr(row, name)
+    if name == "broker":
+        return value.name
+    if isinstance(value, datetime):
+        return _utc(value)
+    return value
+
+
+def _diff(expected: Dict[str, object], stored: Dict[str, list], fields) -> dict:
+    missing, extra, mismatched = [], [], []
+    for tx_id, rows in stored.items():
+        exp = expected.get(tx_id)
+        # Duplicates beyond the first row for a tx are always extra
+        for row in (rows if exp is None else rows[1:]):
+            extra.append({"id": row.id, "tx_id": tx_id})
+        if exp is None:
+            continue
+        changes = {
+            name: {"stored": _stored_value(rows[0], name), "expected": getattr(exp, name)}
+            for name in fields
+            if _stored_value(rows[0], name) != getattr(exp, name)
+        }
+        if changes:
+            mismatched.append({"id": rows[0].id, "tx_id": tx_id, "changes": changes})
+    for tx_id, exp in expected.items():
+        if tx_id not in stored:
+            missing.append(asdict(exp))
+    return {"missing": missing, "extra": extra, "mismatched": mismatched}
+
+
+def _group_by_tx(rows) -> Dict[str, list]:
+    grouped: Dict[str, list] = {}
+    for row in sorted(rows, key=lambda r: r.id):
+        grouped.setdefault(row.tx_id, []).append(row)
+    return grouped
+
+
+def reconcile(db, apply: bool = False, workers: Optional[int] = None) -> dict:
+    """
+    Rebuild lots and gains from transactions, diff against stored rows
+    and optionally apply the fixes atomically.
+    """
+    result, n_partitions = rebuild(db, workers)
+    expected_lots = {lot.tx_id: lot for lot in result.lots}
+    expected_gains = {gain.tx_id: gain for gain in result.gains}
+    stored_lots = _group_by_tx(db.query(Lot).all())
+    stored_gains = _group_by_tx(db.query(Gain).all())
+    report = {
+        "partitions": n_partitions,
+        "lots":       _diff(expected_lots, stored_lots, _LOT_FIELDS),
+        "gains":      _diff(expected_gains, stored_gains, _GAIN_FIELDS),
+        "shortfalls": result.shortfalls,
+        "applied":    False,
+    }
+    if apply:
+        try:
+            _apply(db, report, stored_lots, stored_gains, expected_lots, expected_gains)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        report["applied"] = True
+        rebuild_mirror(db)
+    return report
+
+
+def _apply(db, report, stored_lots, stored_gains, expected_lots, expected_gains):
+    for kind, model, stored, expected in (
+        ("lots", Lot, stored_lots, expected_lots),
+        ("gains", Gain, stored_gains, expected_gains),
+    ):
+        rows_by_id = {row.id: row for rows in stored.values() for row in rows}
+        for item in report[kind]["extra"]:
+            db.delete(rows_by_id[item["id"]])
+        for item in report[kind]["mismatched"]:
+            row = rows_by_id[item["id"]]
+            for name, change in item["changes"].items():
+                value = change["expected"]
+                setattr(row, name, BrokerType[value] if name == "broker" else value)
+        for item in report[kind]["missing"]:
+            values = dict(item, broker=BrokerType[item["broker"]])
+            db.add(model(**values))
+    db.flush()
+    # Gains changed underneath the rollups; recompute them in the same transaction
+    if any(report["gains"].values()):
+        rebuild_rollups(db)
+
+
+def _utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--apply", action="store_true", help="write the fixes")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    db = SessionLocal()
+    try:
+        report = reconcile(db, apply=args.apply, workers=args.workers)
+    finally:
+        db.close()
+    print(json.dumps(report, indent=2, default=str))
+    clean = not any(
+        report[kind][bucket]
+        for kind in ("lots", "gains")
+        for bucket in ("missing", "extra", "mismatched")
+    )
+    return 0 if clean or report["applied"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
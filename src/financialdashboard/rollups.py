@@ -0,0 +1,155 @@
+from datetime import date, datetime, timezone
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import func, select
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from .models.gain import Gain
+from .models.gain_rollup import GainRollup, RollupPeriod
+from .models.transactions import Transaction, BrokerType
+from .fixedpoint import to_fixed, from_fixed
+
+
+def period_starts(ts: datetime) -> List[Tuple[RollupPeriod, date]]:
+    """
+    The day, month and year buckets a sell at `ts` (UTC) falls into.
+    """
+    if ts.tzinfo is not None:
+        ts = ts.astimezone(timezone.utc)
+    day = ts.date()
+    return [
+        (RollupPeriod.day,   day),
+        (RollupPeriod.month, day.replace(day=1)),
+        (RollupPeriod.year,  day.replace(month=1, day=1)),
+    ]
+
+
+def record_gain(db, gain: Gain, sold_at: datetime) -> None:
+    """
+    Fold a newly written Gain into its day/month/year rollups.
+    Runs in the caller's transaction so the rollups commit with the Gain;
+    the increment happens in SQL, so concurrent syncs can't lose updates.
+    """
+    upsert = _UPSERTS[db.get_bind().dialect.name]
+    for period, start in period_starts(sold_at):
+        db.execute(upsert({
+            "period": period,
+            "period_start": start,
+            "asset": gain.asset,
+            "account_id": gain.account_id or "",
+            "broker": gain.broker,
+            "quantity": gain.quantity,
+            "proceeds": gain.proceeds,
+            "profit": gain.profit,
+            "sells": 1,
+        }))
+
+
+_SUMMED = ("quantity", "proceeds", "profit", "sells")
+
+
+def _mysql_upsert(values: dict):
+    table = GainRollup.__table__
+    stmt = mysql_insert(table).values(**values)
+    return stmt.on_duplicate_key_update(
+        {name: table.c[name] + stmt.inserted[name] for name in _SUMMED}
+    )
+
+
+def _sqlite_upsert(values: dict):
+    table = GainRollup.__table__
+    stmt = sqlite_insert(table).values(**values)
+    return stmt.on_conflict_do_update(
+        index_elements=[col.name for col in table.primary_key],
+        set_={name: table.c[name] + stmt.excluded[name] for name in _SUMMED},
+    )
+
+
+# INSERT ... ON DUPLICATE KEY UPDATE x = x + new (MySQL), ON CONFLICT on SQLite
+_UPSERTS = {"mysql": _mysql_upsert, "sqlite": _sqlite_upsert}
+
+
+def rebuild_rollups(db) -> int:
+    """
+    Recompute every rollup from the Gain table (backfilling Gain.account_id
+    from its sell transaction where missing). Flushes but does not commit.
+    Returns the number of rollup rows written.
+    """
+    db.query(Gain).filter(Gain.account_id.is_(None)).update(
+        {Gain.account_id: (
+            select(Transaction.account_id)
+              .where(Transaction.tx_id == Gain.tx_id)
+              .scalar_subquery()
+        )},
+        synchronize_session=False,
+    )
+    db.query(GainRollup).delete(synchronize_session=False)
+    rows = (
+        db.query(
+            Gain.asset,
+            Gain.account_id,
+            Gain.broker,
+            Gain.quantity,
+            Gain.proceeds,
+            Gain.profit,
+            func.coalesce(Transaction.tx_time, Gain.matched_at).label("sold_at"),
+        )
+          .outerjoin(Transaction, Transaction.tx_id == Gain.tx_id)
+          .yield_per(10_000)
+    )
+    # key -> [quantity, proceeds, profit, sells] in fixed-point units
+    buckets: Dict[tuple, list] = {}
+    for r in rows:
+        amounts = (to_fixed(r.quantity), to_fixed(r.proceeds), to_fixed(r.profit))
+        for period, start in period_starts(r.sold_at):
+            acc = buckets.setdefault(
+                (period, start, r.asset, r.account_id or "", r.broker), [0, 0, 0, 0]
+            )
+            acc[0] += amounts[0]
+            acc[1] += amounts[1]
+            acc[2] += amounts[2]
+            acc[3] += 1
+    db.add_all(
+        GainRollup(
+            period = period,
+            period_start = start,
+            asset = asset,
+            account_id = account_id,
+            broker = broker,
+            quantity = from_fixed(qty),
+            proceeds = from_fixed(proceeds),
+            profit = from_fixed(profit),
+            sells = sells,
+        )
+        for (period, start, asset, account_id, broker), (qty, proceeds, profit, sells)
+        in buckets.items()
+    )
+    db.flush()
+    return len(buckets)
+
+
+def rollup_query(
+    db,
+    columns,
+    period: RollupPeriod,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    brokers: Optional[List[BrokerType]] = None,
+    asset: Optional[str] = None,
+    account_id: Optional[str] = None,
+):
+    """
+    Query over one period's rollups with the common filters applied.
+    Cost is bounded by periods x assets x accounts x brokers, not by sells.
+    """
+    query = db.query(*columns).filter(GainRollup.period == period)
+    if start is not None:
+        query = query.filter(GainRollup.period_start >= start)
+    if end is not None:
+        query = query.filter(GainRollup.period_start <= end)
+    if brokers:
+        query = query.filter(GainRollup.broker.in_(brokers))
+    if asset:
+        query = query.filter(GainRollup.asset == asset)
+    if account_id:
+        query = query.filter(GainRollup.account_id == account_id)
+    return query
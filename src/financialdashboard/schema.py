@@ -0,0 +1,62 @@
+"""
+Bring an existing database up to the current models on first use:
+create the tables added since it was set up, add new Gain columns and
+indexes, and backfill the realized-gain rollups once.
+"""
+from sqlalchemy import inspect, text
+from sqlalchemy.orm import Session
+from .models.gain import Gain
+from .models.gain_rollup import GainRollup
+from .models.alert import Alert
+from .rollups import rebuild_rollups
+
+# Tables that did not exist in the original schema
+NEW_TABLES = (GainRollup, Alert)
+# Gain columns added after the table was first created
+NEW_GAIN_COLUMNS = ("account_id",)
+
+
+def ensure_schema(engine) -> None:
+    with engine.begin() as conn:
+        for model in NEW_TABLES:
+            model.metadata.create_all(conn, tables=[model.__table__])
+        _add_missing_columns(conn, Gain.__table__, NEW_GAIN_COLUMNS)
+    # Nothing to backfill before the first sync has created Gain
+    if not inspect(engine).has_table(Gain.__tablename__):
+        return
+    with Session(engine) as db:
+        _backfill_rollups(db)
+
+
+def _add_missing_columns(conn, table, names) -> None:
+    inspector = inspect(conn)
+    if not inspector.has_table(table.name):
+        return
+    existing = {col["name"] for col in inspector.get_columns(table.name)}
+    preparer = conn.dialect.identifier_preparer
+    for name in names:
+        if name in existing:
+            continue
+        column = table.columns[name]
+        conn.execute(text(
+            f"ALTER TABLE {preparer.format_table(table)} "
+            f"ADD COLUMN {preparer.format_column(column)} "
+            f"{column.type.compile(dialect=conn.dialect)} NULL"
+        ))
+    indexed = {index["name"] for index in inspector.get_indexes(table.name)}
+    for index in table.indexes:
+        if index.name not in indexed:
+            index.create(conn)
+
+
+def _backfill_rollups(db) -> None:
+    """
+    Seed the rollups (and Gain.account_id) from existing gains the first
+    time the app runs against a database that predates them.
+    """
+    if db.query(GainRollup.period).first() is not None:
+        return
+    if db.query(Gain.id).first() is None:
+        return
+    rebuild_rollups(db)
+    db.commit()
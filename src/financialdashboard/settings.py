@@ -0,0 +1,62 @@
+import os
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Optional
+
+
+@dataclass(frozen=True)
+class Settings:
+    database_url: str
+    db_echo: bool
+    coinbase_key_id: Optional[str]
+    coinbase_secret_id: Optional[str]
+    coinbase_key_name: Optional[str]
+    coinbase_pem_path: str
+    cutoff_date: datetime
+    alerts_sink: str
+    price_poll_seconds: float
+    fx_ttl_seconds: float
+    archive_payloads: bool
+    archive_dir: str
+    archive_segment_bytes: int
+    replay_archive: bool
+    mirror_url: str
+
+
+@lru_cache(maxsize=None)
+def get_settings() -> Settings:
+    """
+    Read `.env` and the environment once, on first use, instead of
+    at import time in every module that needs configuration.
+    """
+    from dotenv import load_dotenv
+    from dateutil.parser import isoparse
+
+    load_dotenv()
+    cutoff = isoparse(os.getenv("CUTOFF_DATE", "2000-01-01T00:00:00Z"))
+    if cutoff.tzinfo is None:
+        cutoff = cutoff.replace(tzinfo=timezone.utc)
+    return Settings(
+        database_url = os.getenv(
+            "DATABASE_URL", "mysql+pymysql://root:@localhost:3306/FinancialDashboard"
+        ),
+        db_echo = _flag("DB_ECHO", "1"),
+        coinbase_key_id = os.getenv("COINBASE_KEY_ID"),
+        coinbase_secret_id = os.getenv("COINBASE_SECRET_ID"),
+        coinbase_key_name = os.getenv("COINBASE_KEY_NAME"),
+        coinbase_pem_path = os.getenv("COINBASE_PEM_PATH", "coinbase.pem"),
+        cutoff_date = cutoff,
+        alerts_sink = os.getenv("ALERTS_SINK", "alerts.jsonl"),
+        price_poll_seconds = float(os.getenv("PRICE_POLL_SECONDS", "30")),
+        fx_ttl_seconds = float(os.getenv("FX_TTL_SECONDS", "30")),
+        archive_payloads = _flag("ARCHIVE_PAYLOADS", "1"),
+        archive_dir = os.getenv("ARCHIVE_DIR", "archive"),
+        archive_segment_bytes = int(os.getenv("ARCHIVE_SEGMENT_MB", "64")) * 1024 * 1024,
+        replay_archive = _flag("REPLAY_ARCHIVE", "0"),
+        mirror_url = os.getenv("MIRROR_URL", ""),
+    )
+
+
+def _flag(name: str, default: str) -> bool:
+    return os.getenv(name, default).lower() not in ("0", "false", "no", "")
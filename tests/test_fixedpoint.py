@@ -0,0 +1,72 @@
+import random
+from decimal import Decimal
+from fractions import Fraction
+import numpy as np
+from financialdashboard.fixedpoint import (
+    LotColumns, from_fixed, mul_price, muldiv, muldiv_columns, to_fixed,
+)
+
+
+def test_to_fixed_round_trips():
+    for value in ("0", "1", "0.00000001", "12345.67891234", "-3.5"):
+        assert from_fixed(to_fixed(value)) == Decimal(value)
+
+
+def test_muldiv_rounds_half_up():
+    assert muldiv(1, 1, 2) == 1
+    assert muldiv(1, 1, 3) == 0
+    assert muldiv(2, 1, 3) == 1
+
+
+def test_muldiv_columns_matches_muldiv():
+    rng = random.Random(0)
+    limit = np.iinfo(np.int64).max
+    rows = []
+    # cost * remaining / quantity with remaining <= quantity, from small
+    # values up to ones that need the Python fallback
+    for scale in (4, 9, 13, 18):
+        for _ in range(500):
+            c = rng.randint(1, 10**scale)
+            rows.append((rng.randint(0, 10**scale), rng.randint(0, c), c))
+    rows += [(limit, limit, limit), (limit, 1, 3), (1, limit, 2), (0, 5, 7)]
+    a, b, c = (np.array(col, dtype=np.int64) for col in zip(*rows))
+    got = muldiv_columns(a, b, c)
+    assert got.tolist() == [muldiv(x, y, z) for x, y, z in rows]
+
+
+def test_muldiv_columns_zero_quantity_is_zero():
+    got = muldiv_columns(*(np.array(col, dtype=np.int64) for col in ([5], [5], [0])))
+    assert got.tolist() == [0]
+
+
+def test_mul_price_rounds_once():
+    # 1e9 units at $0.00001234567: pre-rounding the price would give $12,350
+    units = to_fixed(10**9)
+    assert from_fixed(mul_price(units, Decimal("0.00001234567"))) == Decimal("12345.67")
+    assert mul_price(to_fixed(3), Fraction(1, 3)) == to_fixed(1)
+
+
+def test_lot_columns_grouping_and_market_value():
+    rows = [
+        ("BTC", "coinbase", to_fixed(2), to_fixed(100), to_fixed(1)),
+        ("BTC", "schwab", to_fixed(1), to_fixed(30), to_fixed(1)),
+        ("ETH", "coinbase", to_fixed(3), to_fixed(10), to_fixed(3)),
+    ]
+    cols = LotColumns.from_rows(rows, ("asset", "broker"))
+    assert cols.group_sums("remaining") == {"BTC": to_fixed(2), "ETH": to_fixed(3)}
+    assert cols.group_sums("cost_remaining", by=("asset", "broker")) == {
+        ("BTC", "coinbase"): to_fixed(50),
+        ("BTC", "schwab"): to_fixed(30),
+        ("ETH", "coinbase"): to_fixed(10),
+    }
+    coinbase = cols.where(cols.keys["broker"] == "coinbase")
+    assert len(coinbase) == 2
+    prices = {"BTC": Decimal("0.5"), "ETH": Decimal("2")}
+    assert coinbase.market_value(prices) == to_fixed("6.5")
+
+
+def test_lot_columns_empty():
+    cols = LotColumns.from_rows([], ("asset",))
+    assert len(cols) == 0
+    assert cols.group_sums("remaining") == {}
+    assert cols.market_value({}) == 0
@@ -0,0 +1,129 @@
+from decimal import Decimal
+from financialdashboard.cb_app import actual_amt
+
+
+class _NoFx:
+    def convert(self, amount, from_ccy, to_ccy):
+        raise AssertionError("trade-time values must not go through today's rates")
+
+
+class _FixedFx:
+    def convert(self, amount, from_ccy, to_ccy):
+        return amount * 2
+
+
+def _buy(subtotal, total, native):
+    return {
+        "type": "buy",
+        "amount": {"amount": "1", "currency": "BTC"},
+        "native_amount": native,
+        "buy": {"subtotal": subtotal, "total": total},
+    }
+
+
+def test_usd_subtotal_is_used_as_is():
+    tx = _buy({"amount": "990", "currency": "USD"}, {"amount": "1000", "currency": "USD"},
+              {"amount": "-1000", "currency": "USD"})
+    assert actual_amt(tx, _NoFx()) == Decimal("990")
+
+
+def test_foreign_subtotal_uses_trade_time_native_amount():
+    # native_amount covers the 1000 EUR total; the subtotal is 99% of it
+    tx = _buy({"amount": "990", "currency": "EUR"}, {"amount": "1000", "currency": "EUR"},
+              {"amount": "-1100", "currency": "USD"})
+    assert actual_amt(tx, _NoFx()) == Decimal("1089")
+
+
+def test_trade_uses_native_amount():
+    tx = {
+        "type": "trade",
+        "amount": {"amount": "-1", "currency": "ETH"},
+        "native_amount": {"amount": "-50", "currency": "USD"},
+    }
+    assert actual_amt(tx, _NoFx()) == Decimal("50")
+
+
+def test_falls_back_to_fx_without_usd_native_amount():
+    tx = _buy({"amount": "10", "currency": "EUR"}, {"amount": "10", "currency": "EUR"},
+              {"amount": "-10", "currency": "EUR"})
+    assert actual_amt(tx, _FixedFx()) == Decimal("20")
+
+
+def test_clean_transactions_drops_staking_and_old(monkeypatch):
+    from financialdashboard.CoinbaseService.CoinbaseService import clean_transactions
+    from financialdashboard.settings import get_settings
+
+    monkeypatch.setenv("CUTOFF_DATE", "2024-01-01T00:00:00Z")
+    get_settings.cache_clear()
+    try:
+        kept = clean_transactions([
+            {"id": "a", "type": "buy", "created_at": "2024-02-01T00:00:00Z"},
+            {"id": "b", "type": "staking_reward", "created_at": "2024-02-01T00:00:00Z"},
+            {"id": "c", "type": "sell", "created_at": "2023-12-31T23:59:59Z"},
+        ])
+    finally:
+        get_settings.cache_clear()
+    assert [tx["id"] for tx in kept] == ["a"]
+
+
+class _ArchiveLikeSvc:
+    """
+    Serves a fixed transaction list for one ETH account, in USD.
+    """
+
+    def __init__(self, txs):
+        self._txs = txs
+
+    def get_all_accounts(self):
+        from financialdashboard.CoinbaseService.CoinbaseService import Account
+
+        return [Account("acct", Decimal("1"), "ETH")]
+
+    def get_transactions(self, id, limit=10):
+        return [dict(tx, account_id=id) for tx in self._txs]
+
+    def convert(self, amount, from_ccy, to_ccy):
+        return amount
+
+
+def _tx(tx_id, tx_type, day, qty, usd):
+    sign = "-" if tx_type == "sell" else ""
+    return {
+        "id": tx_id,
+        "type": tx_type,
+        "created_at": f"2025-01-0{day}T00:00:00Z",
+        "amount": {"amount": f"{sign}{qty}", "currency": "ETH"},
+        "native_amount": {"amount": f"{sign}{usd}", "currency": "USD"},
+        tx_type: {"subtotal": {"amount": str(usd), "currency": "USD"}},
+    }
+
+
+def test_retried_sync_does_not_duplicate_lots(tmp_path, monkeypatch):
+    import pytest
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import Session
+    from financialdashboard.cb_app import update_txns
+    from financialdashboard.models import account_sync, gain, gain_rollup, lot, transactions
+    from financialdashboard.models.gain import Gain
+    from financialdashboard.models.lot import Lot
+    from financialdashboard.settings import get_settings
+
+    monkeypatch.setenv("CUTOFF_DATE", "2000-01-01T00:00:00Z")
+    monkeypatch.setenv("MIRROR_URL", "")
+    get_settings.cache_clear()
+    engine = create_engine(f"sqlite:///{tmp_path / 'sync.db'}")
+    for module in (transactions, lot, gain, gain_rollup, account_sync):
+        module.Base.metadata.create_all(engine)
+
+    buy = _tx("b1", "buy", 1, "12.5", 25000)
+    sell = _tx("s1", "sell", 3, "20", 60000)
+    try:
+        with Session(engine) as db, pytest.raises(ValueError):
+            update_txns(svc=_ArchiveLikeSvc([buy, sell]), db=db)
+        # The retry sees b1 again, plus the buy that covers the sell
+        with Session(engine) as db:
+            update_txns(svc=_ArchiveLikeSvc([buy, _tx("b2", "buy", 2, "7.5", 22500), sell]), db=db)
+            assert db.query(Lot).count() == 0
+            assert [g.profit for g in db.query(Gain).all()] == [Decimal("12500")]
+    finally:
+        get_settings.cache_clear()